@@ -0,0 +1,308 @@
+"""
+Matching spoken answers against a game's vocabulary.
+
+The recognizer's text is split into word tokens once, and the
+vocabulary is compiled into a single regular expression that only
+matches whole words (with an optional plural ending), so "cat" no longer
+matches "category" and "no" no longer matches "know".
+
+Negation works by scope: "not", "no", "never", "none" and words ending
+in "n't" negate the answers in the next NEGATION_SCOPE words, up to a
+scope breaker (or a word the recognizer did not know). "not a cat"
+rejects cat, but "no, it's a cat" and "not a dog, a cat" accept it.
+
+Matchers built with fuzzy=True fall back to a phonetic index when no
+phrase is said exactly, so near-misses like "zeebra" or "xylo phone"
+(adjacent words are joined) are accepted when their score reaches the
+threshold (KLH_FUZZY_THRESHOLD, 0-1, default 0.8).
+
+Numbers are read by a separate single-pass parser (find_numbers) that
+understands units, teens, tens, "hundred", "thousand", digits and
+"a dozen", with the same negation rule.
+"""
+import os
+import re
+from bisect import bisect_right
+from phonetic_index import PhoneticIndex
+
+NEGATION_WORDS = ("no", "not", "never", "none")
+
+# What the recognizer's "[unk]" (a word outside the grammar) tokenizes to
+UNKNOWN_WORD = "unk"
+
+# Words that end a negation's scope: "no, it's a cat", "not the dog but the cat".
+# An unknown word ends it too, so "no [unk] a cat" is not read as "not a cat".
+SCOPE_BREAKERS = frozenset(("but", "it's", "its", "it", "is", "actually", "instead", "yes", UNKNOWN_WORD))
+
+# How many words after a negation it applies to
+NEGATION_SCOPE = 3
+
+# Lowest phonetic score a near-miss needs to count as a phrase
+FUZZY_THRESHOLD = float(os.environ.get("KLH_FUZZY_THRESHOLD", "0.8"))
+
+# Words a near-miss never starts or ends with
+FILLER_WORDS = frozenset(("a", "an", "the", "i", "think", "this", "that", "and", "or", "so", "um", "uh"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+def tokenize(text):
+    """Lower-case word tokens of 'text' (apostrophes kept: "isn't", "it's")"""
+    return _TOKEN_RE.findall(text.lower())
+
+def is_negation(token):
+    return token in NEGATION_WORDS or token.endswith("n't")
+
+def negated_tokens(tokens):
+    """For each token, whether a negation before it applies to it"""
+    negated = [False] * len(tokens)
+    for i, token in enumerate(tokens):
+        if is_negation(token):
+            for j in range(i + 1, min(len(tokens), i + 1 + NEGATION_SCOPE)):
+                if tokens[j] in SCOPE_BREAKERS:
+                    break
+                negated[j] = True
+    return negated
+
+class AnswerMatch:
+    """One vocabulary phrase found in an answer"""
+    __slots__ = ("phrase", "start", "end", "negated", "score")
+
+    def __init__(self, phrase, start, end, negated, score=1.0):
+        self.phrase = phrase
+        self.start = start      # first token
+        self.end = end          # one past the last token
+        self.negated = negated
+        self.score = score      # 1 for an exact match, lower for a near-miss
+
+    def __repr__(self):
+        return f"AnswerMatch({self.phrase!r}, {self.start}, {self.end}, negated={self.negated}, score={self.score:.2f})"
+
+class AnswerMatcher:
+    """Finds the phrases of one vocabulary in recognized text"""
+    def __init__(self, phrases, fuzzy=False, threshold=FUZZY_THRESHOLD):
+        self.phrases = {}
+        for phrase in phrases:
+            key = " ".join(tokenize(str(phrase)))
+            if key:
+                self.phrases[key] = phrase
+        # Longest first, so "twenty three" wins over "twenty"
+        alternatives = sorted(self.phrases, key=len, reverse=True)
+        self._regex = re.compile(
+            r"(?<![\w'])(" + "|".join(re.escape(p) for p in alternatives) + r")(?:e?s)?(?![\w'])"
+            if alternatives else r"(?!)")
+        self.threshold = threshold
+        self.index = PhoneticIndex(self.phrases.values()) if fuzzy else None
+        # Near-misses may be split over one more word than the longest phrase: "xylo phone"
+        self._max_words = max((len(p.split()) for p in self.phrases), default=0) + 1
+
+    def find(self, text):
+        """Return every vocabulary phrase in 'text', in order, as AnswerMatch objects"""
+        tokens = tokenize(text)
+        joined = " ".join(tokens)
+        # Character offset where each token starts, to turn regex matches into token positions
+        starts = []
+        offset = 0
+        for token in tokens:
+            starts.append(offset)
+            offset += len(token) + 1
+
+        negated = negated_tokens(tokens)
+
+        matches = []
+        for found in self._regex.finditer(joined):
+            start = bisect_right(starts, found.start()) - 1
+            end = bisect_right(starts, found.end() - 1)
+            matches.append(AnswerMatch(self.phrases[found.group(1)], start, end, negated[start]))
+        if not matches and self.index is not None:
+            matches = self._find_near_misses(tokens, negated)
+        return matches
+
+    def _find_near_misses(self, tokens, negated):
+        """Best-scoring near-misses of the vocabulary, without overlaps, in order"""
+        candidates = []
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(len(tokens), start + self._max_words) + 1):
+                words = tokens[start:end]
+                if (words[0] in FILLER_WORDS or words[-1] in FILLER_WORDS
+                        or any(is_negation(w) or w in SCOPE_BREAKERS or w.isdigit() for w in words)):
+                    continue
+                phrase, score = self.index.lookup("".join(words))
+                if phrase is not None and score >= self.threshold:
+                    candidates.append((score, start, end, phrase))
+
+        taken = [False] * len(tokens)
+        matches = []
+        for score, start, end, phrase in sorted(candidates, key=lambda c: (-c[0], c[1])):
+            if not any(taken[start:end]):
+                taken[start:end] = [True] * (end - start)
+                matches.append(AnswerMatch(phrase, start, end, negated[start], score))
+        return sorted(matches, key=lambda match: match.start)
+
+    def says(self, text, target):
+        """True when 'text' says 'target' without negating it"""
+        key = " ".join(tokenize(str(target)))
+        return any(match.phrase == self.phrases.get(key) and not match.negated
+                   for match in self.find(text))
+
+    def says_any(self, texts, target):
+        """
+        True when any of 'texts' (the recognizer's alternatives, best
+        first) says 'target', unless the best one only negates it
+        """
+        phrase = self.phrases.get(" ".join(tokenize(str(target))))
+        for i, text in enumerate(texts):
+            found = [match for match in self.find(text) if match.phrase == phrase]
+            if any(not match.negated for match in found):
+                return True
+            if i == 0 and found:
+                return False
+        return False
+
+    def answers(self, text):
+        """The vocabulary phrases said in 'text' without a negation, in order"""
+        return [match.phrase for match in self.find(text) if not match.negated]
+
+# Matchers are compiled once per vocabulary
+_matchers = {}
+
+def get_matcher(phrases, fuzzy=False, threshold=FUZZY_THRESHOLD):
+    """Shared AnswerMatcher for a vocabulary (with a phonetic fallback if 'fuzzy')"""
+    words = tuple(sorted(set(str(phrase) for phrase in phrases)))
+    key = (words, fuzzy, threshold)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = AnswerMatcher(words, fuzzy, threshold)
+    return matcher
+
+UNIT_WORDS = {"zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+              "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
+TEEN_WORDS = {"ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+              "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19}
+TENS_WORDS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+              "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+
+# Which kind of word may follow which inside one number:
+# "twenty three", "one hundred (and) five", "two thousand twenty"
+_JOINS = {
+    "tens": ("unit",),
+    "hundred": ("unit", "teen", "tens"),
+    "and": ("unit", "teen", "tens"),
+    "thousand": ("unit", "teen", "tens"),
+}
+
+def spell_number(number):
+    """Words for 0-999 the way the recognizer writes them: 'twenty three', 'one hundred five'"""
+    if number < 10:
+        return next(word for word, value in UNIT_WORDS.items() if value == number)
+    if number < 20:
+        return next(word for word, value in TEEN_WORDS.items() if value == number)
+    if number < 100:
+        tens = next(word for word, value in TENS_WORDS.items() if value == number - number % 10)
+        return tens if number % 10 == 0 else f"{tens} {spell_number(number % 10)}"
+    hundreds = f"{spell_number(number // 100)} hundred"
+    return hundreds if number % 100 == 0 else f"{hundreds} {spell_number(number % 100)}"
+
+def find_numbers(text):
+    """
+    Read every number said in 'text' in one pass over its tokens.
+    Returns AnswerMatch objects whose phrase is the number's value.
+    """
+    tokens = tokenize(text)
+    negated = negated_tokens(tokens)
+    matches = []
+    # The number being read: its thousands, the part below a thousand,
+    # where it started and ended, and the kind of its last word
+    thousands, below, start, end, last = 0, None, 0, 0, None
+
+    def flush():
+        nonlocal thousands, below, last
+        if last is not None:
+            matches.append(AnswerMatch(thousands + (below or 0), start, end, negated[start]))
+        thousands, below, last = 0, None, None
+
+    def small_number(i, value, kind):
+        nonlocal below, start, end, last
+        if last is not None and kind in _JOINS.get(last, ()):
+            below = (below or 0) + value
+        else:
+            flush()
+            below, start = value, i
+        end, last = i + 1, kind
+
+    for i, token in enumerate(tokens):
+        if token.isdigit():
+            flush()
+            matches.append(AnswerMatch(int(token), i, i + 1, negated[i]))
+        elif token in UNIT_WORDS:
+            small_number(i, UNIT_WORDS[token], "unit")
+        elif token in TEEN_WORDS:
+            small_number(i, TEEN_WORDS[token], "teen")
+        elif token in TENS_WORDS:
+            small_number(i, TENS_WORDS[token], "tens")
+        elif token == "hundred":
+            if last in ("unit", "teen", "tens") and below < 100:
+                below *= 100     # "three hundred", "nineteen hundred"
+            else:
+                flush()          # "a hundred", "hundred"
+                below, start = 100, i - 1 if i and tokens[i - 1] == "a" else i
+            end, last = i + 1, "hundred"
+        elif token == "thousand":
+            if last is not None and last != "thousand" and thousands == 0:
+                thousands, below = (below or 1) * 1000, None
+            else:
+                flush()
+                thousands, start = 1000, i - 1 if i and tokens[i - 1] == "a" else i
+            end, last = i + 1, "thousand"
+        elif token == "dozen":
+            if last == "unit" and thousands == 0:
+                below *= 12      # "two dozen"
+                end = i + 1
+            else:
+                flush()          # "a dozen", "half a dozen"
+                if i >= 2 and tokens[i - 2:i] == ["half", "a"]:
+                    below, start = 6, i - 2
+                else:
+                    below, start = 12, i - 1 if i and tokens[i - 1] == "a" else i
+                end, last = i + 1, "dozen"
+            flush()
+        elif token == "and" and last in ("hundred", "thousand"):
+            last = "and"         # "one hundred and five"
+        else:
+            flush()
+    flush()
+    return matches
+
+def parse_numbers(text):
+    """Every number said in 'text' and not negated, in order"""
+    return [match.phrase for match in find_numbers(text) if not match.negated]
+
+def number_may_grow(text, largest=None):
+    """
+    True when 'text' ends in a number that more words could still turn
+    into a bigger one, no larger than 'largest' if given: "twenty"
+    (three), "one" (hundred), "one hundred and" (five).
+    """
+    tokens = tokenize(text)
+    if len(tokens) > 1 and tokens[-1] == "and" and tokens[-2] in ("hundred", "thousand"):
+        tokens = tokens[:-1]
+    numbers = find_numbers(" ".join(tokens))
+    if not numbers or numbers[-1].end != len(tokens):
+        return False
+    value, last = numbers[-1].phrase, tokens[-1]
+    if last in TENS_WORDS or last in ("hundred", "thousand"):
+        smallest = value + 1
+    elif (last in UNIT_WORDS or last in TEEN_WORDS) and 0 < value < 100:
+        smallest = value * 100
+    else:
+        return False
+    return largest is None or smallest <= largest
+
+def says_number_any(texts, number):
+    """The number version of AnswerMatcher.says_any"""
+    for i, text in enumerate(texts):
+        found = [match for match in find_numbers(text) if match.phrase == number]
+        if any(not match.negated for match in found):
+            return True
+        if i == 0 and found:
+            return False
+    return False
@@ -3,12 +3,21 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 import sys
+from voice_utils import preload_model, model_signals
+from sound_bank import preload_sounds
 
 class GameMenu(QMainWindow):
     def __init__(self):
         super().__init__()
         self.initUI()
         
+        # Start loading the voice model now so it is ready by the time a game asks
+        model_signals.progress.connect(self.voiceLoading)
+        model_signals.ready.connect(self.voiceReady)
+        model_signals.failed.connect(self.voiceFailed)
+        preload_model()
+        preload_sounds()
+        
     def initUI(self):
         # Set window properties
         self.setWindowTitle('Kids Learning Games')
@@ -40,6 +49,10 @@ class GameMenu(QMainWindow):
             QPushButton:hover {
                 background-color: #0984e3;
             }
+            QLabel#voiceStatusLabel {
+                color: #7f8c8d;
+                font-size: 14px;
+            }
         """)
         
         # Create central widget
@@ -80,6 +93,21 @@ class GameMenu(QMainWindow):
             layout.addWidget(button)            
         layout.addStretch()
         
+        # Voice model loading status
+        self.voice_status = QLabel("Loading voice model... ⏳", self)
+        self.voice_status.setObjectName("voiceStatusLabel")
+        self.voice_status.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.voice_status)
+        
+    def voiceLoading(self, percent, message):
+        self.voice_status.setText(f"{message} {percent}% ⏳")
+        
+    def voiceReady(self):
+        self.voice_status.setText("Voice ready! 🎤")
+        
+    def voiceFailed(self, message):
+        self.voice_status.setText(f"Voice unavailable: {message}")
+        
     def gameSelected(self):
         sender = self.sender()
         game_name = sender.text()
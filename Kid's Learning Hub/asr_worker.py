@@ -0,0 +1,261 @@
+"""
+Out-of-process speech recognition.
+
+The Vosk model and all decoding live in a separate worker process, so
+AcceptWaveform never competes with the PyQt5 event loop or the pygame
+mixer for the interpreter. Audio is handed to the worker through a
+shared-memory ring buffer; only small JSON control messages travel over
+the worker's stdin/stdout.
+"""
+import os
+import sys
+import json
+import queue
+import threading
+import subprocess
+from multiprocessing import shared_memory
+
+# Size of the shared audio ring; each chunk is consumed before the next is written
+WORKER_RING_BYTES = 64 * 1024
+
+# How long to wait for the worker (seconds): to load its model, and to
+# answer any other request. A worker that misses a deadline is killed and
+# restarted on the next call.
+STARTUP_TIMEOUT = 120.0
+REPLY_TIMEOUT = 10.0
+
+class AsrWorker:
+    """
+    Handle on the recognition worker process.
+    Started once and shared by every game window; if the process dies it
+    is restarted on the next call and its grammars are registered again.
+    """
+    def __init__(self, model_path, capacity=WORKER_RING_BYTES):
+        self.model_path = model_path
+        self.capacity = capacity
+        self._lock = threading.RLock()
+        self._process = None
+        self._replies = None
+        self._shm = None
+        self._position = 0
+        # Grammar tuple (None for the open vocabulary) -> (id, sample rate)
+        self._grammars = {}
+        # Grammar id -> recognizer options ("max_alternatives", "words") set on it
+        self._options = {}
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        """Start the worker and wait until its model is loaded"""
+        with self._lock:
+            if self.is_alive():
+                return
+            self._cleanup()
+            self._shm = shared_memory.SharedMemory(create=True, size=self.capacity)
+            self._position = 0
+            try:
+                self._process = subprocess.Popen(
+                    [sys.executable, os.path.abspath(__file__), self.model_path, self._shm.name, str(self.capacity)],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+                # Replies are read on a thread of their own so every wait can have a deadline
+                self._replies = queue.Queue()
+                threading.Thread(target=_read_replies, args=(self._process.stdout, self._replies),
+                                 daemon=True).start()
+                message = self._receive(STARTUP_TIMEOUT)
+            except Exception:
+                # Don't leak the worker or the shared memory block
+                self._cleanup()
+                raise
+            if "error" in message:
+                self._cleanup()
+                raise RuntimeError(f"Voice worker failed to start: {message['error']}")
+
+            # Recognizers from before a restart keep working
+            for grammar, (grammar_id, rate) in self._grammars.items():
+                self._send(op="grammar", grammar=grammar_id, words=grammar, rate=rate)
+            for grammar_id, options in self._options.items():
+                for name, value in options.items():
+                    self._send(op="option", grammar=grammar_id, name=name, value=value)
+
+    def recognizer(self, grammar=None, rate=16000):
+        """Return a recognizer for 'grammar' whose decoding happens in the worker"""
+        with self._lock:
+            if grammar not in self._grammars:
+                self._grammars[grammar] = (len(self._grammars), rate)
+                if self.is_alive():
+                    self._send(op="grammar", grammar=self._grammars[grammar][0], words=grammar, rate=rate)
+            return RemoteRecognizer(self, self._grammars[grammar][0])
+
+    def call(self, **message):
+        """Send one request to the worker and return its value"""
+        with self._lock:
+            if not self.is_alive():
+                print("Voice worker is not running, restarting it...")
+                self.start()
+            return self._send(**message)
+
+    def set_option(self, grammar_id, name, value):
+        """Set a recognizer option in the worker, remembered across restarts"""
+        with self._lock:
+            self._options.setdefault(grammar_id, {})[name] = value
+            return self.call(op="option", grammar=grammar_id, name=name, value=value)
+
+    def accept_waveform(self, grammar_id, data):
+        """Copy audio into the shared ring and have the worker decode it"""
+        with self._lock:
+            if not self.is_alive():
+                self.start()
+            size = len(data)
+            start = self._position % self.capacity
+            first = min(size, self.capacity - start)
+            self._shm.buf[start:start + first] = data[:first]
+            self._shm.buf[:size - first] = data[first:]
+            position = self._position
+            self._position += size
+            return self._send(op="accept", grammar=grammar_id, position=position, size=size)
+
+    def close(self):
+        with self._lock:
+            if self.is_alive():
+                try:
+                    self._process.stdin.write(json.dumps({"op": "quit"}) + "\n")
+                    self._process.stdin.flush()
+                    self._process.wait(timeout=2)
+                except Exception:
+                    self._process.kill()
+            self._cleanup()
+
+    def _send(self, **message):
+        self._process.stdin.write(json.dumps(message) + "\n")
+        self._process.stdin.flush()
+        reply = self._receive()
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply.get("value")
+
+    def _receive(self, timeout=REPLY_TIMEOUT):
+        try:
+            line = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            self._cleanup()
+            raise RuntimeError(f"Voice worker did not answer within {timeout:g}s; it will be restarted")
+        if not line:
+            raise RuntimeError("Voice worker exited unexpectedly")
+        return json.loads(line)
+
+    def _cleanup(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+        self._process = None
+        self._replies = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+def _read_replies(stream, replies):
+    """Reader thread: pass the worker's reply lines on, then "" once it exits"""
+    for line in stream:
+        replies.put(line)
+    replies.put("")
+
+class RemoteRecognizer:
+    """Stands in for a KaldiRecognizer whose decoding happens in the worker process"""
+    def __init__(self, worker, grammar_id):
+        self._worker = worker
+        self._grammar_id = grammar_id
+
+    def AcceptWaveform(self, data):
+        return self._worker.accept_waveform(self._grammar_id, data)
+
+    def Result(self):
+        return self._worker.call(op="result", grammar=self._grammar_id)
+
+    def PartialResult(self):
+        return self._worker.call(op="partial", grammar=self._grammar_id)
+
+    def FinalResult(self):
+        return self._worker.call(op="final", grammar=self._grammar_id)
+
+    def Reset(self):
+        return self._worker.call(op="reset", grammar=self._grammar_id)
+
+    def SetMaxAlternatives(self, max_alternatives):
+        return self._worker.set_option(self._grammar_id, "max_alternatives", max_alternatives)
+
+    def SetWords(self, words):
+        return self._worker.set_option(self._grammar_id, "words", bool(words))
+
+def _worker_main(model_path, shm_name, capacity):
+    """Entry point of the worker process"""
+    # Keep stdout for the protocol; anything printed goes to stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def reply(**message):
+        out.write(json.dumps(message) + "\n")
+        out.flush()
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # The parent owns the block; stop this process's tracker from unlinking it
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+    try:
+        from vosk import Model, KaldiRecognizer
+        model = Model(model_path)
+        recognizer = KaldiRecognizer(model, 16000)
+        recognizer.AcceptWaveform(b"\x00" * 32000)
+        recognizer.FinalResult()
+    except Exception as e:
+        reply(error=str(e))
+        return
+    reply(event="ready")
+
+    recognizers = {}
+    for line in sys.stdin:
+        message = json.loads(line)
+        op = message["op"]
+        if op == "quit":
+            break
+        try:
+            value = None
+            if op == "grammar":
+                words = message["words"]
+                if words is None:
+                    recognizers[message["grammar"]] = KaldiRecognizer(model, message["rate"])
+                else:
+                    recognizers[message["grammar"]] = KaldiRecognizer(model, message["rate"],
+                                                                      json.dumps(list(words) + ["[unk]"]))
+            elif op == "accept":
+                start = message["position"] % capacity
+                size = message["size"]
+                first = min(size, capacity - start)
+                data = bytes(shm.buf[start:start + first]) + bytes(shm.buf[:size - first])
+                value = bool(recognizers[message["grammar"]].AcceptWaveform(data))
+            elif op == "partial":
+                value = recognizers[message["grammar"]].PartialResult()
+            elif op == "result":
+                value = recognizers[message["grammar"]].Result()
+            elif op == "final":
+                value = recognizers[message["grammar"]].FinalResult()
+            elif op == "reset":
+                recognizers[message["grammar"]].Reset()
+            elif op == "option":
+                recognizer = recognizers[message["grammar"]]
+                if message["name"] == "max_alternatives":
+                    recognizer.SetMaxAlternatives(message["value"])
+                elif message["name"] == "words":
+                    recognizer.SetWords(message["value"])
+            reply(value=value)
+        except Exception as e:
+            reply(error=str(e))
+
+    shm.close()
+
+if __name__ == "__main__":
+    _worker_main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
@@ -0,0 +1,160 @@
+"""
+Index of every picture and sound the games use.
+
+assets/manifest.json lists each asset once with its label, categories,
+size on disk and, for pictures, their dimensions or, for sounds, their
+duration, format and where the PCM data starts in the file. It is loaded
+once, and the games look assets up by category and label in it instead
+of keeping their own lists and probing the filesystem while playing.
+
+Regenerate it after adding, removing or changing assets:
+    python asset_manifest.py
+Without a manifest the assets are indexed on the fly at startup.
+"""
+import os
+import sys
+import json
+import wave
+import struct
+import argparse
+import threading
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(ROOT_DIR, "assets", "manifest.json")
+
+# Bump when the manifest layout changes
+MANIFEST_VERSION = 1
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+SOUND_EXTENSIONS = (".wav",)
+
+# Category -> (folder, extensions, labels left out)
+CATEGORIES = {
+    # Pictures named in NameObjectGame (sheep and tiger only reveal animals)
+    "objects": ("assets/images", IMAGE_EXTENSIONS, ("sheep", "tiger")),
+    # Every picture: counted in CountNumbersGame, revealed in AnimalSoundGame
+    "pictures": ("assets/images", IMAGE_EXTENSIONS, ()),
+    "animal_sounds": ("assets/sounds/animals", SOUND_EXTENSIONS, ()),
+    "feedback_sounds": ("assets/sounds", SOUND_EXTENSIONS, ()),
+}
+
+def _label(name):
+    return os.path.splitext(name)[0].replace("_", " ").replace("-", " ").lower()
+
+def _image_info(path):
+    try:
+        from PIL import Image
+    except ImportError:
+        return {}
+    with Image.open(path) as image:
+        return {"width": image.width, "height": image.height}
+
+def _wav_data_chunk(path):
+    """Return (offset, size) of the PCM data in a RIFF/WAVE file"""
+    with open(path, "rb") as f:
+        riff, _, form = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or form != b"WAVE":
+            raise ValueError(f"{path}: not a WAV file")
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"data":
+                return f.tell(), size
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+def _sound_info(path):
+    with wave.open(path, "rb") as wav:
+        info = {
+            "duration": round(wav.getnframes() / wav.getframerate(), 3),
+            "rate": wav.getframerate(),
+            "channels": wav.getnchannels(),
+            "sample_width": wav.getsampwidth(),
+        }
+    info["data_offset"], info["data_bytes"] = _wav_data_chunk(path)
+    return info
+
+def build_manifest(root_dir=ROOT_DIR):
+    """Scan the asset folders and return the manifest"""
+    assets = {}
+    categories = {}
+    for category, (folder, extensions, excluded) in CATEGORIES.items():
+        keys = []
+        for name in sorted(os.listdir(os.path.join(root_dir, folder))):
+            if not name.lower().endswith(extensions) or _label(name) in excluded:
+                continue
+            key = f"{folder}/{name}"
+            if key not in assets:
+                path = os.path.join(root_dir, folder, name)
+                entry = {"name": name, "label": _label(name), "bytes": os.path.getsize(path)}
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    entry["kind"] = "image"
+                    entry.update(_image_info(path))
+                else:
+                    entry["kind"] = "sound"
+                    entry.update(_sound_info(path))
+                assets[key] = entry
+            keys.append(key)
+        categories[category] = keys
+    return {"version": MANIFEST_VERSION, "assets": assets, "categories": categories}
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+class AssetManifest:
+    def __init__(self, data, root_dir=ROOT_DIR):
+        self.assets = {}
+        for key, entry in data["assets"].items():
+            entry = dict(entry, key=key, path=os.path.join(root_dir, *key.split("/")))
+            self.assets[key] = entry
+        # category -> list of entries, and category -> label -> entry
+        self._by_category = {}
+        self._by_label = {}
+        for category, keys in data["categories"].items():
+            entries = [self.assets[key] for key in keys]
+            self._by_category[category] = entries
+            self._by_label[category] = {entry["label"]: entry for entry in entries}
+
+    def category(self, category):
+        """Return the entries of a category, in name order"""
+        return self._by_category.get(category, [])
+
+    def find(self, category, label):
+        """Return the entry with this label in a category, or None"""
+        return self._by_label.get(category, {}).get(label)
+
+# Global manifest shared by every game
+_manifest = None
+_manifest_lock = threading.Lock()
+
+def get_manifest():
+    """Load the manifest once (indexing the asset folders if it is missing)"""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            try:
+                with open(MANIFEST_PATH) as f:
+                    data = json.load(f)
+                if data.get("version") != MANIFEST_VERSION:
+                    raise ValueError("unsupported manifest version")
+            except (OSError, ValueError) as e:
+                print(f"Asset manifest unavailable ({e}); indexing assets. Run 'python asset_manifest.py' to create it.")
+                data = build_manifest()
+            _manifest = AssetManifest(data)
+    return _manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate assets/manifest.json from the asset folders.")
+    parser.add_argument("--output", default=MANIFEST_PATH, help="where to write the manifest")
+    args = parser.parse_args(argv)
+
+    manifest = build_manifest()
+    write_manifest(manifest, args.output)
+    print(f"Indexed {len(manifest['assets'])} assets into {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
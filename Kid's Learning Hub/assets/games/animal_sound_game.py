@@ -8,7 +8,14 @@ from PyQt5.QtCore import Qt, pyqtSignal, QObject
 from PyQt5.QtGui import QFont, QPixmap
 # We need to adjust import to go up one level in the folder structure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from voice_utils import speak, listen
+from voice_utils import listen, register_vocabulary, keyword_predicate, answer_texts, ANSWER_ALTERNATIVES
+from answer_matching import get_matcher
+from speech_cache import register_phrases, preload_speech
+from sound_bank import preload_sound_pack
+from audio_scheduler import get_audio_scheduler, PRIORITY_FEEDBACK, PRIORITY_PROMPT
+from image_cache import get_scaled_pixmap
+from asset_manifest import get_manifest
+from assets.games.voice_gate import VoiceGateMixin
 import pygame
 
 # Initialize pygame mixer and set lower volume
@@ -21,26 +28,42 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 ANIMAL_SOUNDS_FOLDER = os.path.join(ROOT_DIR, "assets", "sounds", "animals")
 FEEDBACK_SOUNDS_FOLDER = os.path.join(ROOT_DIR, "assets", "sounds")
 
-# Animal data - mapping sound files to animal names
-ANIMALS = {
-    "cat.wav": "cat",
-    "cow.wav": "cow",
-    "dog.wav": "dog",
-    "elephant.wav": "elephant", 
-    "horse.wav": "horse",
-    "sheep.wav": "sheep",
-    "tiger.wav": "tiger"
-}
+# Animal data - mapping sound files to animal names, from the asset manifest
+ANIMALS = {asset["name"]: asset["label"] for asset in get_manifest().category("animal_sounds")}
+
+# Answers the recognizer should listen for
+register_vocabulary("animals", ANIMALS.values())
+
+# Whole-word matcher for the animal names, compiled once, that also
+# accepts near-misses like "elefant"
+ANSWER_MATCHER = get_matcher(ANIMALS.values(), fuzzy=True)
+
+# Voice hints, rendered ahead of time by the speech cache
+register_phrases(["Which animal made that sound?"] + [f"{start} It's a {label}"
+                                                      for label in ANIMALS.values() for start in ("Correct!", "Oops!")])
+
+# Animal clips in the shared sound bank, keyed "animals/<file>"
+ANIMAL_SOUNDS = {f"animals/{sound_file}": os.path.join(ANIMAL_SOUNDS_FOLDER, sound_file)
+                 for sound_file in ANIMALS}
 
 # Communication between threads
 class VoiceSignals(QObject):
-    result_ready = pyqtSignal(str)
+    result_ready = pyqtSignal(object)  # a voice_utils.Recognition
+    partial_ready = pyqtSignal(str)
     listening_done = pyqtSignal()
 
-class AnimalSoundGame(QMainWindow):
+class AnimalSoundGame(VoiceGateMixin, QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         pygame.mixer.init()
+        # Render any voice hints not cached yet, in the background
+        preload_speech()
+        # Every sound this game makes goes through the shared audio scheduler
+        self.audio = get_audio_scheduler()
+        self.audio.finished.connect(self.sound_finished)
+        self.sound_request = None
+        # Decode all the animal clips once, in the background
+        preload_sound_pack("animals", ANIMAL_SOUNDS, DEFAULT_VOLUME)
         self.score = 0
         self.current_index = 0
         
@@ -54,8 +77,12 @@ class AnimalSoundGame(QMainWindow):
         
         # Connect signals
         self.signals.result_ready.connect(self.process_voice_result)
+        self.signals.partial_ready.connect(self.show_partial)
         self.signals.listening_done.connect(self.listening_finished)
         
+        # Keep the Answer button locked until the voice model has loaded
+        self.gate_answer_button()
+        
         # Load the first animal sound
         self.load_random_animal()
         self.update_feature_unlocks()
@@ -248,6 +275,9 @@ class AnimalSoundGame(QMainWindow):
     
     def load_random_animal(self):
         """Load a random animal sound"""
+        # Drop the prompts still waiting from the previous round
+        self.audio.new_round(self)
+        
         # Choose a random animal
         self.current_index = random.randrange(0, len(self.animal_list))
         sound_file, animal_name = self.animal_list[self.current_index]
@@ -271,7 +301,7 @@ class AnimalSoundGame(QMainWindow):
         
         # Voice hints only for basic levels
         if self.score < 10:
-            threading.Thread(target=lambda: speak(question), daemon=True).start()
+            self.audio.say(question, PRIORITY_PROMPT, owner=self)
         
         # Automatically play the sound
         self.play_current_sound()
@@ -279,32 +309,27 @@ class AnimalSoundGame(QMainWindow):
     def play_current_sound(self):
         """Play the current animal sound"""
         if self.current["sound_file"]:
-            sound_path = os.path.join(ANIMAL_SOUNDS_FOLDER, self.current["sound_file"])
-            if os.path.exists(sound_path):
-                # Disable the play button temporarily to prevent multiple plays
-                self.play_button.setEnabled(False)
-                
-                sound = pygame.mixer.Sound(sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
-                
-                # Re-enable the button after a short delay
-                threading.Timer(1.5, lambda: self.play_button.setEnabled(True)).start()
+            self.sound_request = self.audio.play(f"animals/{self.current['sound_file']}", PRIORITY_PROMPT, owner=self)
+            # Disable the play button until the sound has played, to prevent multiple plays
+            self.play_button.setEnabled(False)
+    
+    def sound_finished(self, request_id, completed):
+        """Called by the audio scheduler when a sound ends or is cancelled"""
+        if request_id == self.sound_request:
+            self.sound_request = None
+            self.play_button.setEnabled(True)
     
     def show_animal_image(self, show_correct=True):
         """Show the animal image after answering"""
         if show_correct:
             animal = self.current["correct_answer"]
-            # Try to find an image for this animal
-            possible_extensions = ['.png', '.jpg', '.jpeg']
-            for ext in possible_extensions:
-                image_path = os.path.join(ROOT_DIR, "assets", "images", f"{animal}{ext}")
-                if os.path.exists(image_path):
-                    pixmap = QPixmap(image_path)
-                    scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    self.animal_icon.setPixmap(scaled_pixmap)
-                    self.animal_icon.setText("")  # Clear the text
-                    return
+            # Look up the picture for this animal
+            picture = get_manifest().find("pictures", animal)
+            if picture is not None:
+                scaled_pixmap = get_scaled_pixmap(picture["path"], 180, 180, self.animal_icon.devicePixelRatioF())
+                self.animal_icon.setPixmap(scaled_pixmap)
+                self.animal_icon.setText("")  # Clear the text
+                return
             
             # If no image is found, just show the animal name
             self.animal_icon.setText(animal.title())
@@ -322,7 +347,10 @@ class AnimalSoundGame(QMainWindow):
     
     def _listen_thread(self):
         """Thread function for voice recognition"""
-        answer = listen()
+        # Stop listening as soon as the right answer is clearly heard
+        accept = keyword_predicate(self.current["correct_answer"])
+        answer = listen(vocabulary="animals", on_partial=self.signals.partial_ready.emit, accept=accept,
+                        alternatives=ANSWER_ALTERNATIVES)
         self.signals.result_ready.emit(answer)
         self.signals.listening_done.emit()
     
@@ -346,14 +374,8 @@ class AnimalSoundGame(QMainWindow):
             self.status_label.setStyleSheet("color: orange;")
             return
         
-        normalized_answer = answer.lower().strip()
-        
-        # Detect negations to avoid false positives
-        negations = ["not", "no", "n't", "never", "none"]
-        contains_negation = any(neg in normalized_answer for neg in negations)
-        contains_correct_word = self.current["correct_answer"] in normalized_answer
-        
-        if contains_correct_word and not contains_negation:
+        # Accept the answer as a whole word in any likely alternative, unless it is negated ("not a ...")
+        if ANSWER_MATCHER.says_any(answer_texts(answer), self.current["correct_answer"]):
             # Correct answer
             self.score += 5
             self.status_label.setText(f"Correct! It's a {self.current['correct_answer']}. ✅")
@@ -362,25 +384,23 @@ class AnimalSoundGame(QMainWindow):
             # Show the animal image
             self.show_animal_image(True)
             
+            # Play correct sound, then the spoken feedback
+            self.audio.play("correct_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
             if self.score < 10:
-                threading.Thread(target=lambda: speak(f"Correct! It's a {self.current['correct_answer']}"), daemon=True).start()
-            
-            # Play correct sound if file exists
-            correct_sound_path = os.path.join(FEEDBACK_SOUNDS_FOLDER, "correct_answer.wav")
-            if os.path.exists(correct_sound_path):
-                sound = pygame.mixer.Sound(correct_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
+                self.audio.say(f"Correct! It's a {self.current['correct_answer']}", PRIORITY_FEEDBACK, owner=self)
             
             self.hint_label.setText("")
         else:
             # Wrong answer
             self.score = max(0, self.score - 2)
             
+            # Play wrong sound, then the spoken feedback
+            self.audio.play("wrong_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
+            
             if self.score < 10:
                 self.status_label.setText(f"Oops! It's a {self.current['correct_answer']}. ❌")
                 self.status_label.setStyleSheet("color: red;")
-                threading.Thread(target=lambda: speak(f"Oops! It's a {self.current['correct_answer']}"), daemon=True).start()
+                self.audio.say(f"Oops! It's a {self.current['correct_answer']}", PRIORITY_FEEDBACK, owner=self)
                 # Show the correct animal
                 self.show_animal_image(True)
                 self.hint_label.setText("")
@@ -392,14 +412,18 @@ class AnimalSoundGame(QMainWindow):
                 self.status_label.setText(f"Oops! It's wrong. ❌")
                 self.status_label.setStyleSheet("color: red;")
                 self.hint_label.setText("")
-            
-            # Play wrong sound if file exists
-            wrong_sound_path = os.path.join(FEEDBACK_SOUNDS_FOLDER, "wrong_answer.wav")
-            if os.path.exists(wrong_sound_path):
-                sound = pygame.mixer.Sound(wrong_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
         
         # Update score and features
         self.score_label.setText(f"Score: {self.score}")
         self.update_feature_unlocks()
+    
+    def closeEvent(self, event):
+        """Stop this window's sounds and let go of the shared signals"""
+        try:
+            self.audio.finished.disconnect(self.sound_finished)
+        except TypeError:
+            # Not connected (already closed once)
+            pass
+        self.audio.cancel(self)
+        self.release_voice_gate()
+        super().closeEvent(event)
@@ -4,12 +4,16 @@ import threading
 import random
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QFrame)
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QPoint
-from PyQt5.QtGui import QFont, QPixmap, QColor, QPainter, QPen, QBrush, QPainterPath
-import math
+from PyQt5.QtCore import Qt, pyqtSignal, QObject
+from PyQt5.QtGui import QFont, QPixmap, QColor, QPainter
 # We need to adjust import to go up one level in the folder structure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from voice_utils import speak, listen
+from voice_utils import listen, register_vocabulary, keyword_predicate, answer_texts, ANSWER_ALTERNATIVES
+from answer_matching import get_matcher
+from speech_cache import register_phrases, preload_speech
+from audio_scheduler import get_audio_scheduler, PRIORITY_FEEDBACK, PRIORITY_PROMPT
+from assets.games.shape_geometry import paint_shape, prerender_shapes
+from assets.games.voice_gate import VoiceGateMixin
 import pygame
 
 # Initialize pygame mixer and set lower volume
@@ -35,6 +39,17 @@ COLORS = {
     "white": (255, 255, 255)
 }
 
+# Answers the recognizer should listen for
+register_vocabulary("colors", COLORS.keys())
+
+# Whole-word matcher for the color names, compiled once; "purpel" still
+# counts, but "block" is not black
+ANSWER_MATCHER = get_matcher(COLORS.keys(), fuzzy=True)
+
+# Voice hints, rendered ahead of time by the speech cache
+register_phrases(["What color is this shape?"] + [f"{start} It's {color}"
+                                                  for color in COLORS for start in ("Correct!", "Oops!")])
+
 # Shape types
 SHAPES = ["circle", "square", "triangle", "star", "heart"]
 
@@ -64,99 +79,41 @@ class ColorShapeWidget(QWidget):
     def paintEvent(self, event):
         super().paintEvent(event)
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        width = self.width()
-        height = self.height()
-        r, g, b = self.color
-        
-        # Draw shape
-        painter.setPen(QPen(QColor(max(0, r - 50), max(0, g - 50), max(0, b - 50)), 3))
-        painter.setBrush(QBrush(QColor(r, g, b)))
-        
-        # Draw based on shape type
-        if self.shape == "circle":
-            diameter = min(width, height) - 40
-            painter.drawEllipse((width - diameter) // 2, (height - diameter) // 2, diameter, diameter)
-        
-        elif self.shape == "square":
-            side = min(width, height) - 40
-            painter.drawRect((width - side) // 2, (height - side) // 2, side, side)
-        
-        elif self.shape == "triangle":
-            side = min(width, height) - 40
-            x1 = (width - side) // 2
-            y1 = (height + side) // 2  # Bottom left
-            x2 = width // 2  # Top middle
-            y2 = (height - side) // 2
-            x3 = (width + side) // 2  # Bottom right
-            y3 = (height + side) // 2
-            points = [
-                QPoint(x1, y1),
-                QPoint(x2, y2),
-                QPoint(x3, y3)
-            ]
-            painter.drawPolygon(*points)
-        
-        elif self.shape == "star":
-            radius = min(width, height) // 2 - 20
-            center_x = width // 2
-            center_y = height // 2
-            
-            # Create a 5-pointed star
-            points = []
-            for i in range(10):
-                angle = (i * 36) * 3.14159 / 180
-                # Alternate between outer and inner radius
-                point_radius = radius if i % 2 == 0 else radius // 2
-                x = center_x + int(point_radius * math.sin(angle))
-                y = center_y - int(point_radius * math.cos(angle))
-                points.append(QPoint(x, y))
-            
-            painter.drawPolygon(*points)
-            
-        elif self.shape == "heart":
-            # Draw a simple heart
-            width = min(width, height) - 40
-            height = width  # Make it square
-            x = (self.width() - width) // 2
-            y = (self.height() - height) // 2
-            
-            # Create a path for the heart shape
-            path = QPainterPath()
-            path.moveTo(x + width // 2, y + height * 0.75)
-            path.cubicTo(
-                x + width * 0.25, y + height * 0.4,
-                x, y + height * 0.5,
-                x + width // 2, y
-            )
-            path.cubicTo(
-                x + width, y + height * 0.5,
-                x + width * 0.75, y + height * 0.4,
-                x + width // 2, y + height * 0.75
-            )
-            painter.drawPath(path)
+        
+        # Draw shape (blitted from the shared raster cache after the first paint)
+        paint_shape(painter, self.shape, self.color, self.width(), self.height(), self.devicePixelRatioF())
 
 # Communication between threads
 class VoiceSignals(QObject):
-    result_ready = pyqtSignal(str)
+    result_ready = pyqtSignal(object)  # a voice_utils.Recognition
+    partial_ready = pyqtSignal(str)
     listening_done = pyqtSignal()
 
-class ColorGame(QMainWindow):
+class ColorGame(VoiceGateMixin, QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         pygame.mixer.init()
+        # Render any voice hints not cached yet, in the background
+        preload_speech()
+        # Every sound this game makes goes through the shared audio scheduler
+        self.audio = get_audio_scheduler()
         self.score = 0
         self.current_color = ""
         self.current_shape = ""
+        # The next round is picked ahead so its shape can be drawn in the background
+        self.next_round = None
         self.color_list = list(COLORS.items())
         self.signals = VoiceSignals()
         self.initUI()
         
         # Connect signals
         self.signals.result_ready.connect(self.process_voice_result)
+        self.signals.partial_ready.connect(self.show_partial)
         self.signals.listening_done.connect(self.listening_finished)
         
+        # Keep the Answer button locked until the voice model has loaded
+        self.gate_answer_button()
+        
         # Load the first color
         self.load_random_color_shape()
         self.update_feature_unlocks()
@@ -321,9 +278,21 @@ class ColorGame(QMainWindow):
             
     def load_random_color_shape(self):
         """Load a random color and shape"""
+        # Drop the prompts still waiting from the previous round
+        self.audio.new_round(self)
+        
         # Choose random colors and shape
-        self.current_color = random.choice(list(COLORS.keys()))
-        self.current_shape = random.choice(SHAPES)
+        if self.next_round is not None:
+            self.current_color, self.current_shape = self.next_round
+        else:
+            self.current_color = random.choice(list(COLORS.keys()))
+            self.current_shape = random.choice(SHAPES)
+        
+        # Pick the next round now and draw it while this one is played
+        self.next_round = (random.choice(list(COLORS.keys())), random.choice(SHAPES))
+        widget = self.color_shape_widget
+        prerender_shapes([(self.next_round[1], COLORS[self.next_round[0]])],
+                         widget.width(), widget.height(), widget.devicePixelRatioF())
         
         # Update the widget
         self.color_shape_widget.set_color_shape(COLORS[self.current_color], self.current_shape)
@@ -340,7 +309,7 @@ class ColorGame(QMainWindow):
         
         # Voice hints only for basic levels
         if self.score < 10:
-            threading.Thread(target=lambda: speak(question), daemon=True).start()
+            self.audio.say(question, PRIORITY_PROMPT, owner=self)
     
     def check_answer(self):
         """Start the voice recognition process"""
@@ -354,7 +323,10 @@ class ColorGame(QMainWindow):
     
     def _listen_thread(self):
         """Thread function for voice recognition"""
-        answer = listen()
+        # Stop listening as soon as the right answer is clearly heard
+        accept = keyword_predicate(self.current_color)
+        answer = listen(vocabulary="colors", on_partial=self.signals.partial_ready.emit, accept=accept,
+                        alternatives=ANSWER_ALTERNATIVES)
         self.signals.result_ready.emit(answer)
         self.signals.listening_done.emit()
     
@@ -378,38 +350,30 @@ class ColorGame(QMainWindow):
             self.status_label.setStyleSheet("color: orange;")
             return
         
-        normalized_answer = answer.lower().strip()
-        
-        # Detect negations to avoid false positives
-        negations = ["not", "no", "n't", "never", "none"]
-        contains_negation = any(neg in normalized_answer for neg in negations)
-        contains_correct_word = self.current_color in normalized_answer
-        
-        if contains_correct_word and not contains_negation:
+        # Accept the answer as a whole word in any likely alternative, unless it is negated ("not a ...")
+        if ANSWER_MATCHER.says_any(answer_texts(answer), self.current_color):
             # Correct answer
             self.score += 5
             self.status_label.setText(f"Correct! It's {self.current_color}. ✅")
             self.status_label.setStyleSheet("color: green;")
             
+            # Play correct sound, then the spoken feedback
+            self.audio.play("correct_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
             if self.score < 10:
-                threading.Thread(target=lambda: speak(f"Correct! It's {self.current_color}"), daemon=True).start()
-            
-            # Play correct sound if file exists
-            correct_sound_path = os.path.join(SOUNDS_FOLDER, "correct_answer.wav")
-            if os.path.exists(correct_sound_path):
-                sound = pygame.mixer.Sound(correct_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
+                self.audio.say(f"Correct! It's {self.current_color}", PRIORITY_FEEDBACK, owner=self)
             
             self.hint_label.setText("")
         else:
             # Wrong answer
             self.score = max(0, self.score - 2)
             
+            # Play wrong sound, then the spoken feedback
+            self.audio.play("wrong_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
+            
             if self.score < 10:
                 self.status_label.setText(f"Oops! It's {self.current_color}. ❌")
                 self.status_label.setStyleSheet("color: red;")
-                threading.Thread(target=lambda: speak(f"Oops! It's {self.current_color}"), daemon=True).start()
+                self.audio.say(f"Oops! It's {self.current_color}", PRIORITY_FEEDBACK, owner=self)
                 self.hint_label.setText("")
             elif 10 <= self.score < 20:
                 self.status_label.setText(f"Oops! It's wrong. ❌")
@@ -419,14 +383,13 @@ class ColorGame(QMainWindow):
                 self.status_label.setText(f"Oops! It's wrong. ❌")
                 self.status_label.setStyleSheet("color: red;")
                 self.hint_label.setText("")
-            
-            # Play wrong sound if file exists
-            wrong_sound_path = os.path.join(SOUNDS_FOLDER, "wrong_answer.wav")
-            if os.path.exists(wrong_sound_path):
-                sound = pygame.mixer.Sound(wrong_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
         
         # Update score and features
         self.score_label.setText(f"Score: {self.score}")
         self.update_feature_unlocks()
+    
+    def closeEvent(self, event):
+        """Stop this window's sounds and let go of the shared signals"""
+        self.audio.cancel(self)
+        self.release_voice_gate()
+        super().closeEvent(event)
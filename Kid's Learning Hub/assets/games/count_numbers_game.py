@@ -3,12 +3,18 @@ import sys
 import threading
 import random
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QPushButton, QLabel, QFrame, QGridLayout)
+                            QPushButton, QLabel, QFrame)
 from PyQt5.QtCore import Qt, pyqtSignal, QObject, QSize
 from PyQt5.QtGui import QFont, QPixmap
 # We need to adjust import to go up one level in the folder structure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from voice_utils import speak, listen
+from voice_utils import listen, register_vocabulary, number_predicate, answer_texts, ANSWER_ALTERNATIVES
+from answer_matching import says_number_any, spell_number
+from speech_cache import register_phrases, preload_speech
+from audio_scheduler import get_audio_scheduler, PRIORITY_FEEDBACK, PRIORITY_PROMPT
+from assets.games.tiled_image_widget import TiledImageWidget
+from asset_manifest import get_manifest
+from assets.games.voice_gate import VoiceGateMixin
 import pygame
 
 # Initialize pygame mixer and set lower volume
@@ -21,24 +27,52 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 IMAGES_FOLDER = os.path.join(ROOT_DIR, "assets", "images")
 FEEDBACK_SOUNDS_FOLDER = os.path.join(ROOT_DIR, "assets", "sounds")
 
+# Number words the recognizer writes: "one" -> 1, "twenty three" -> 23, up to "one hundred"
+LARGEST_NUMBER = 100
+NUMBER_WORDS = {spell_number(number): number for number in range(LARGEST_NUMBER + 1)}
+
+# Counting levels: (lowest score, largest count)
+LEVELS = [
+    (0, 5),      # Simple counting (1-5)
+    (10, 10),    # Medium counting (1-10)
+    (20, 20),    # Advanced counting (1-20)
+    (30, 50),    # Counting in tens (1-50)
+    (40, 100),   # Expert counting (1-100)
+]
+
+def largest_count(score):
+    """Return the largest count a challenge can have at 'score'"""
+    return [count for min_score, count in LEVELS if score >= min_score][-1]
+
+# Answers the recognizer should listen for
+register_vocabulary("numbers", list(NUMBER_WORDS) + ["a dozen", "half a dozen"])
+
 # Get all available image files
 def get_all_images():
-    images = []
-    # Check all files in the images directory
-    for file in os.listdir(IMAGES_FOLDER):
-        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-            images.append(file)
-    return images
+    # Every picture listed in the asset manifest
+    return [asset["name"] for asset in get_manifest().category("pictures")]
+
+# Voice hints, rendered ahead of time by the speech cache. Feedback is only
+# spoken while the score stays below 10, so after a correct answer (+5) to a
+# challenge set below 5 or a wrong one (-2) to a challenge set below 12
+register_phrases([f"How many {os.path.splitext(name)[0]}s do you see?" for name in get_all_images()]
+                 + [f"Correct! There are {count} items." for count in range(1, largest_count(4) + 1)]
+                 + [f"Oops! There are {count} items." for count in range(1, largest_count(11) + 1)])
 
 # Communication between threads
 class VoiceSignals(QObject):
-    result_ready = pyqtSignal(str)
+    result_ready = pyqtSignal(object)  # a voice_utils.Recognition
+    partial_ready = pyqtSignal(str)
     listening_done = pyqtSignal()
 
-class CountNumbersGame(QMainWindow):
+class CountNumbersGame(VoiceGateMixin, QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         pygame.mixer.init()
+        # Render any voice hints not cached yet, in the background
+        preload_speech()
+        # Every sound this game makes goes through the shared audio scheduler
+        self.audio = get_audio_scheduler()
         self.score = 0
         
         # Get all available images
@@ -47,7 +81,6 @@ class CountNumbersGame(QMainWindow):
         # Game state
         self.current_count = 0
         self.current_image = ""
-        self.image_widgets = []
         
         # Set up UI and signals
         self.signals = VoiceSignals()
@@ -55,8 +88,12 @@ class CountNumbersGame(QMainWindow):
         
         # Connect signals
         self.signals.result_ready.connect(self.process_voice_result)
+        self.signals.partial_ready.connect(self.show_partial)
         self.signals.listening_done.connect(self.listening_finished)
         
+        # Keep the Answer button locked until the voice model has loaded
+        self.gate_answer_button()
+        
         # Load the first counting challenge
         self.load_new_challenge()
         self.update_feature_unlocks()
@@ -165,10 +202,11 @@ class CountNumbersGame(QMainWindow):
         image_frame.setMinimumHeight(300)
         image_frame.setMaximumHeight(400)
         
-        # Create grid layout for images
-        self.image_grid_layout = QGridLayout(image_frame)
-        self.image_grid_layout.setSpacing(10)
-        self.image_grid_layout.setContentsMargins(10, 10, 10, 10)
+        # One widget paints all the items, however many there are
+        image_frame_layout = QVBoxLayout(image_frame)
+        image_frame_layout.setContentsMargins(10, 10, 10, 10)
+        self.image_grid = TiledImageWidget(image_frame)
+        image_frame_layout.addWidget(self.image_grid)
         
         main_layout.addWidget(image_frame)
         
@@ -231,29 +269,31 @@ class CountNumbersGame(QMainWindow):
             self.feature_label.setText("💡 Simple Counting (1-5) (Score < 10)")
         elif 10 <= self.score < 20:
             self.feature_label.setText("📊 Medium Counting (1-10) (Score 10 - 19)")
+        elif 20 <= self.score < 30:
+            self.feature_label.setText("🧮 Advanced Counting (1-20) (Score 20 - 29)")
+        elif 30 <= self.score < 40:
+            self.feature_label.setText("🔟 Counting in Tens (1-50) (Score 30 - 39)")
         else:
-            self.feature_label.setText("🧮 Advanced Counting (1-15) (Score 20+)")
+            self.feature_label.setText("🏆 Expert Counting (1-100) (Score 40+)")
+    
+    def max_count(self):
+        """Return the largest count for the current score"""
+        return largest_count(self.score)
     
     def clear_image_grid(self):
         """Clear all images from the grid"""
-        # Remove all existing image widgets
-        for widget in self.image_widgets:
-            self.image_grid_layout.removeWidget(widget)
-            widget.deleteLater()
-        self.image_widgets = []
+        self.image_grid.clear()
     
     def load_new_challenge(self):
         """Load a new counting challenge"""
+        # Drop the prompts still waiting from the previous round
+        self.audio.new_round(self)
+        
         # Clear current images
         self.clear_image_grid()
         
         # Determine the range based on score
-        if self.score < 10:
-            max_count = 5  # Simple counting (1-5)
-        elif 10 <= self.score < 20:
-            max_count = 10  # Medium counting (1-10)
-        else:
-            max_count = 15  # Advanced counting (1-15)
+        max_count = self.max_count()
             
         # Choose a random count from 1 to max_count
         self.current_count = random.randint(1, max_count)
@@ -263,40 +303,19 @@ class CountNumbersGame(QMainWindow):
             self.current_image = random.choice(self.all_images)
             image_path = os.path.join(IMAGES_FOLDER, self.current_image)
             
-            # Calculate grid dimensions based on count
+            # Scale the image based on count (smaller when more items)
+            # and group bigger counts so they are easier to count
             if self.current_count <= 5:
-                cols = min(self.current_count, 3)
+                size, grouping = 120, "grid"
             elif self.current_count <= 10:
-                cols = min(self.current_count, 4)
+                size, grouping = 100, "grid"
+            elif self.current_count <= 20:
+                size, grouping = 80, "rows_of_five"
             else:
-                cols = 5
-                
-            rows = (self.current_count + cols - 1) // cols  # Ceiling division
+                size, grouping = 60, "tens_frames"
             
-            # Add the images to the grid
-            count = 0
-            for row in range(rows):
-                for col in range(cols):
-                    if count < self.current_count:
-                        # Create image label
-                        image_label = QLabel()
-                        pixmap = QPixmap(image_path)
-                        
-                        # Scale the image based on count (smaller when more items)
-                        if self.current_count <= 5:
-                            size = 120
-                        elif self.current_count <= 10:
-                            size = 100
-                        else:
-                            size = 80
-                            
-                        scaled_pixmap = pixmap.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        
-                        image_label.setPixmap(scaled_pixmap)
-                        image_label.setAlignment(Qt.AlignCenter)
-                        self.image_grid_layout.addWidget(image_label, row, col)
-                        self.image_widgets.append(image_label)
-                        count += 1
+            # The picture is scaled once and painted for every item
+            self.image_grid.set_tiles(image_path, self.current_count, grouping, size)
         
         # Update labels
         question = f"How many {os.path.splitext(self.current_image)[0]}s do you see?"
@@ -310,7 +329,7 @@ class CountNumbersGame(QMainWindow):
         
         # Voice hints only for basic levels
         if self.score < 10:
-            threading.Thread(target=lambda: speak(question), daemon=True).start()
+            self.audio.say(question, PRIORITY_PROMPT, owner=self)
     
     def check_answer(self):
         """Start the voice recognition process"""
@@ -324,7 +343,10 @@ class CountNumbersGame(QMainWindow):
     
     def _listen_thread(self):
         """Thread function for voice recognition"""
-        answer = listen()
+        # Stop listening as soon as the right number is clearly heard
+        accept = number_predicate(self.current_count, LARGEST_NUMBER)
+        answer = listen(vocabulary="numbers", on_partial=self.signals.partial_ready.emit, accept=accept,
+                        alternatives=ANSWER_ALTERNATIVES)
         self.signals.result_ready.emit(answer)
         self.signals.listening_done.emit()
     
@@ -348,28 +370,8 @@ class CountNumbersGame(QMainWindow):
             self.status_label.setStyleSheet("color: orange;")
             return
         
-        # Process the answer - extract numbers
-        correct_answer = False
-        
-        # Convert word numbers to digits: one -> 1, two -> 2, etc.
-        number_words = {
-            "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
-            "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
-            "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15
-        }
-        
-        normalized_answer = answer.lower().strip()
-        
-        # First check if the answer contains the number as a word
-        for word, num in number_words.items():
-            if word in normalized_answer and num == self.current_count:
-                correct_answer = True
-                break
-        
-        # Also check for digits in the answer
-        if not correct_answer:
-            if str(self.current_count) in normalized_answer:
-                correct_answer = True
+        # Process the answer - any number said, as words or digits, in a likely alternative and not negated
+        correct_answer = says_number_any(answer_texts(answer), self.current_count)
         
         if correct_answer:
             # Correct answer
@@ -377,25 +379,23 @@ class CountNumbersGame(QMainWindow):
             self.status_label.setText(f"Correct! There are {self.current_count} items. ✅")
             self.status_label.setStyleSheet("color: green;")
             
+            # Play correct sound, then the spoken feedback
+            self.audio.play("correct_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
             if self.score < 10:
-                threading.Thread(target=lambda: speak(f"Correct! There are {self.current_count} items."), daemon=True).start()
-            
-            # Play correct sound if file exists
-            correct_sound_path = os.path.join(FEEDBACK_SOUNDS_FOLDER, "correct_answer.wav")
-            if os.path.exists(correct_sound_path):
-                sound = pygame.mixer.Sound(correct_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
+                self.audio.say(f"Correct! There are {self.current_count} items.", PRIORITY_FEEDBACK, owner=self)
             
             self.hint_label.setText("")
         else:
             # Wrong answer
             self.score = max(0, self.score - 2)
             
+            # Play wrong sound, then the spoken feedback
+            self.audio.play("wrong_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
+            
             if self.score < 10:
                 self.status_label.setText(f"Oops! There are {self.current_count} items. ❌")
                 self.status_label.setStyleSheet("color: red;")
-                threading.Thread(target=lambda: speak(f"Oops! There are {self.current_count} items."), daemon=True).start()
+                self.audio.say(f"Oops! There are {self.current_count} items.", PRIORITY_FEEDBACK, owner=self)
                 self.hint_label.setText("")
             elif 10 <= self.score < 20:
                 self.status_label.setText(f"Oops! That's not right. ❌")
@@ -412,14 +412,13 @@ class CountNumbersGame(QMainWindow):
                 self.status_label.setText(f"Oops! That's not right. ❌")
                 self.status_label.setStyleSheet("color: red;")
                 self.hint_label.setText("")
-            
-            # Play wrong sound if file exists
-            wrong_sound_path = os.path.join(FEEDBACK_SOUNDS_FOLDER, "wrong_answer.wav")
-            if os.path.exists(wrong_sound_path):
-                sound = pygame.mixer.Sound(wrong_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
         
         # Update score and features
         self.score_label.setText(f"Score: {self.score}")
         self.update_feature_unlocks()
+    
+    def closeEvent(self, event):
+        """Stop this window's sounds and let go of the shared signals"""
+        self.audio.cancel(self)
+        self.release_voice_gate()
+        super().closeEvent(event)
@@ -9,7 +9,13 @@ from PyQt5.QtCore import Qt, pyqtSignal, QObject
 from PyQt5.QtGui import QFont, QPixmap
 # We need to adjust import to go up one level in the folder structure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from voice_utils import speak, listen
+from voice_utils import listen, register_vocabulary, keyword_predicate, answer_texts, ANSWER_ALTERNATIVES
+from answer_matching import get_matcher
+from speech_cache import register_phrases, preload_speech
+from audio_scheduler import get_audio_scheduler, PRIORITY_FEEDBACK, PRIORITY_PROMPT
+from image_cache import get_scaled_pixmap
+from asset_manifest import get_manifest
+from assets.games.voice_gate import VoiceGateMixin
 import pygame
 
 # Initialize pygame mixer and set lower volume
@@ -22,47 +28,34 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 OBJECTS_FOLDER = os.path.join(ROOT_DIR, "assets", "images")
 SOUNDS_FOLDER = os.path.join(ROOT_DIR, "assets", "sounds")
 
-# Object data
-OBJECTS = {
-    "apple.png": "apple",
-    "ball.png": "ball",
-    "cat.png": "cat",
-    "cow.png": "cow",
-    "dog.png": "dog",
-    "elephant.png": "elephant",
-    "fan.png": "fan",
-    "grass.png": "grass",
-    "horse.jpg": "horse",
-    "igloo.jpg": "igloo",
-    "jar.png": "jar",
-    "kangaroo.jpg": "kangaroo",
-    "lemon.jpg": "lemon",
-    "lion.png": "lion",
-    "mango.jpg": "mango",
-    "nest.jpg": "nest",
-    "owl.jpg": "owl",
-    "panda.jpg": "panda",
-    "quill.png": "quill",
-    "rainbow.jpg": "rainbow",
-    "stars.jpg": "stars",
-    "torch.png": "torch",
-    "umbrella.jpg": "umbrella",
-    "volcano.jpg": "volcano",
-    "waterfall.jpg": "waterfall", 
-    "xylophone.png": "xylophone",
-    "yak.jpg": "yak",
-    "zebra.jpg": "zebra"
-}
+# Object data: picture file -> answer, from the asset manifest
+OBJECTS = {asset["name"]: asset["label"] for asset in get_manifest().category("objects")}
+
+# Answers the recognizer should listen for
+register_vocabulary("objects", OBJECTS.values())
+
+# Whole-word matcher for the object names, compiled once. Long names are
+# easy to mangle, so near-misses like "kangaru" count too
+ANSWER_MATCHER = get_matcher(OBJECTS.values(), fuzzy=True)
+
+# Voice hints, rendered ahead of time by the speech cache
+register_phrases(["What is this?"] + [f"{start} It's a {label}"
+                                      for label in OBJECTS.values() for start in ("Correct!", "Oops!")])
 
 # Communication between threads
 class VoiceSignals(QObject):
-    result_ready = pyqtSignal(str)
+    result_ready = pyqtSignal(object)  # a voice_utils.Recognition
+    partial_ready = pyqtSignal(str)
     listening_done = pyqtSignal()
 
-class NameObjectGame(QMainWindow):
+class NameObjectGame(VoiceGateMixin, QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         pygame.mixer.init()
+        # Render any voice hints not cached yet, in the background
+        preload_speech()
+        # Every sound this game makes goes through the shared audio scheduler
+        self.audio = get_audio_scheduler()
         self.score = 0
         self.current_index = 0
         
@@ -76,8 +69,12 @@ class NameObjectGame(QMainWindow):
         
         # Connect signals
         self.signals.result_ready.connect(self.process_voice_result)
+        self.signals.partial_ready.connect(self.show_partial)
         self.signals.listening_done.connect(self.listening_finished)
         
+        # Keep the Answer button locked until the voice model has loaded
+        self.gate_answer_button()
+        
         # Load the first object
         self.load_object_by_index(self.current_index)
         self.update_feature_unlocks()
@@ -259,6 +256,9 @@ class NameObjectGame(QMainWindow):
     
     def load_object_by_index(self, index):
         """Load an object image by its index in the list"""
+        # Drop the prompts still waiting from the previous round
+        self.audio.new_round(self)
+        
         if 0 <= index < len(self.object_list):
             image_file, correct_answer = self.object_list[index]
             self.current["image_file"] = image_file
@@ -266,8 +266,7 @@ class NameObjectGame(QMainWindow):
             
             # Load image
             image_path = os.path.join(OBJECTS_FOLDER, image_file)
-            pixmap = QPixmap(image_path)
-            pixmap = pixmap.scaled(400, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pixmap = get_scaled_pixmap(image_path, 400, 300, self.img_label.devicePixelRatioF())
             self.img_label.setPixmap(pixmap)
             
             # Update labels
@@ -281,7 +280,7 @@ class NameObjectGame(QMainWindow):
             
             # Play "What is this?" voice hint if score < 10
             if self.score < 10:
-                threading.Thread(target=lambda: speak("What is this?"), daemon=True).start()
+                self.audio.say("What is this?", PRIORITY_PROMPT, owner=self)
     
     def check_answer(self):
         """Start the voice recognition process"""
@@ -295,7 +294,10 @@ class NameObjectGame(QMainWindow):
     
     def _listen_thread(self):
         """Thread function for voice recognition"""
-        answer = listen()
+        # Stop listening as soon as the right answer is clearly heard
+        accept = keyword_predicate(self.current["correct_answer"])
+        answer = listen(vocabulary="objects", on_partial=self.signals.partial_ready.emit, accept=accept,
+                        alternatives=ANSWER_ALTERNATIVES)
         self.signals.result_ready.emit(answer)
         self.signals.listening_done.emit()
     
@@ -319,38 +321,30 @@ class NameObjectGame(QMainWindow):
             self.status_label.setStyleSheet("color: orange;")
             return
         
-        normalized_answer = answer.lower().strip()
-        
-        # Detect negations to avoid false positives
-        negations = ["not", "no", "n't", "never", "none"]
-        contains_negation = any(neg in normalized_answer for neg in negations)
-        contains_correct_word = self.current["correct_answer"] in normalized_answer
-        
-        if contains_correct_word and not contains_negation:
+        # Accept the answer as a whole word in any likely alternative, unless it is negated ("not a ...")
+        if ANSWER_MATCHER.says_any(answer_texts(answer), self.current["correct_answer"]):
             # Correct answer
             self.score += 5
             self.status_label.setText(f"Correct! It's a {self.current['correct_answer']}. ✅")
             self.status_label.setStyleSheet("color: green;")
             
+            # Play correct sound, then the spoken feedback
+            self.audio.play("correct_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
             if self.score < 10:
-                threading.Thread(target=lambda: speak(f"Correct! It's a {self.current['correct_answer']}"), daemon=True).start()
-            
-            # Play correct sound if file exists
-            correct_sound_path = os.path.join(SOUNDS_FOLDER, "correct_answer.wav")
-            if os.path.exists(correct_sound_path):
-                sound = pygame.mixer.Sound(correct_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
+                self.audio.say(f"Correct! It's a {self.current['correct_answer']}", PRIORITY_FEEDBACK, owner=self)
             
             self.hint_label.setText("")
         else:
             # Wrong answer
             self.score = max(0, self.score - 2)
             
+            # Play wrong sound, then the spoken feedback
+            self.audio.play("wrong_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
+            
             if self.score < 10:
                 self.status_label.setText(f"Oops! It's a {self.current['correct_answer']}. ❌")
                 self.status_label.setStyleSheet("color: red;")
-                threading.Thread(target=lambda: speak(f"Oops! It's a {self.current['correct_answer']}"), daemon=True).start()
+                self.audio.say(f"Oops! It's a {self.current['correct_answer']}", PRIORITY_FEEDBACK, owner=self)
                 self.hint_label.setText("")
             elif 10 <= self.score < 20:
                 self.status_label.setText(f"Oops! It's wrong. ❌")
@@ -360,13 +354,6 @@ class NameObjectGame(QMainWindow):
                 self.status_label.setText(f"Oops! It's wrong. ❌")
                 self.status_label.setStyleSheet("color: red;")
                 self.hint_label.setText("")
-            
-            # Play wrong sound if file exists
-            wrong_sound_path = os.path.join(SOUNDS_FOLDER, "wrong_answer.wav")
-            if os.path.exists(wrong_sound_path):
-                sound = pygame.mixer.Sound(wrong_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
         
         # Update score and features
         self.score_label.setText(f"Score: {self.score}")
@@ -380,3 +367,9 @@ class NameObjectGame(QMainWindow):
         """Load the previous object"""
         self.current_index = (self.current_index - 1) % len(self.object_list)
         self.load_object_by_index(self.current_index)
+    
+    def closeEvent(self, event):
+        """Stop this window's sounds and let go of the shared signals"""
+        self.audio.cancel(self)
+        self.release_voice_gate()
+        super().closeEvent(event)
@@ -4,12 +4,16 @@ import threading
 import random
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QFrame)
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QPoint
-from PyQt5.QtGui import QFont, QPixmap, QColor, QPainter, QPen, QBrush, QPainterPath
-import math
+from PyQt5.QtCore import Qt, pyqtSignal, QObject
+from PyQt5.QtGui import QFont, QPixmap, QColor, QPainter
 # We need to adjust import to go up one level in the folder structure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from voice_utils import speak, listen
+from voice_utils import listen, register_vocabulary, keyword_predicate, answer_texts, ANSWER_ALTERNATIVES
+from answer_matching import get_matcher
+from speech_cache import register_phrases, preload_speech
+from audio_scheduler import get_audio_scheduler, PRIORITY_FEEDBACK, PRIORITY_PROMPT
+from assets.games.shape_geometry import paint_shape
+from assets.games.voice_gate import VoiceGateMixin
 import pygame
 
 # Initialize pygame mixer and set lower volume
@@ -35,6 +39,17 @@ SHAPES = [
     "diamond"
 ]
 
+# Answers the recognizer should listen for
+register_vocabulary("shapes", SHAPES)
+
+# Whole-word matcher for the shape names, compiled once, that also
+# accepts near-misses like "tryangle" (but not "hard" for heart)
+ANSWER_MATCHER = get_matcher(SHAPES, fuzzy=True)
+
+# Voice hints, rendered ahead of time by the speech cache
+register_phrases(["What shape is this?"] + [f"{start} It's a {shape}"
+                                            for shape in SHAPES for start in ("Correct!", "Oops!")])
+
 # We'll use a single color for all shapes
 DEFAULT_COLOR = (64, 158, 255)  # A nice blue color
 
@@ -62,163 +77,25 @@ class ShapeWidget(QWidget):
     def paintEvent(self, event):
         super().paintEvent(event)
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        width = self.width()
-        height = self.height()
-        r, g, b = DEFAULT_COLOR
-        
-        # Draw shape
-        painter.setPen(QPen(QColor(max(0, r - 50), max(0, g - 50), max(0, b - 50)), 3))
-        painter.setBrush(QBrush(QColor(r, g, b)))
-        
-        # Draw based on shape type
-        if self.shape == "circle":
-            diameter = min(width, height) - 40
-            painter.drawEllipse((width - diameter) // 2, (height - diameter) // 2, diameter, diameter)
-        
-        elif self.shape == "square":
-            side = min(width, height) - 40
-            painter.drawRect((width - side) // 2, (height - side) // 2, side, side)
-        
-        elif self.shape == "rectangle":
-            width_rect = min(width, height) - 40
-            height_rect = width_rect * 0.6  # Make it rectangular, not square
-            painter.drawRect(
-                (width - width_rect) // 2,
-                (height - height_rect) // 2,
-                width_rect,
-                height_rect
-            )
-        
-        elif self.shape == "triangle":
-            side = min(width, height) - 40
-            x1 = (width - side) // 2
-            y1 = (height + side) // 2  # Bottom left
-            x2 = width // 2  # Top middle
-            y2 = (height - side) // 2
-            x3 = (width + side) // 2  # Bottom right
-            y3 = (height + side) // 2
-            points = [
-                QPoint(x1, y1),
-                QPoint(x2, y2),
-                QPoint(x3, y3)
-            ]
-            painter.drawPolygon(*points)
-        
-        elif self.shape == "star":
-            radius = min(width, height) // 2 - 20
-            center_x = width // 2
-            center_y = height // 2
-            
-            # Create a 5-pointed star
-            points = []
-            for i in range(10):
-                angle = (i * 36) * 3.14159 / 180
-                # Alternate between outer and inner radius
-                point_radius = radius if i % 2 == 0 else radius // 2
-                x = center_x + int(point_radius * math.sin(angle))
-                y = center_y - int(point_radius * math.cos(angle))
-                points.append(QPoint(x, y))
-            
-            painter.drawPolygon(*points)
-            
-        elif self.shape == "heart":
-            # Draw a simple heart
-            width_rect = min(width, height) - 40
-            height_rect = width_rect  # Make it square
-            x = (self.width() - width_rect) // 2
-            y = (self.height() - height_rect) // 2
-            
-            # Create a path for the heart shape
-            path = QPainterPath()
-            path.moveTo(x + width_rect // 2, y + height_rect * 0.75)
-            path.cubicTo(
-                x + width_rect * 0.25, y + height_rect * 0.4,
-                x, y + height_rect * 0.5,
-                x + width_rect // 2, y
-            )
-            path.cubicTo(
-                x + width_rect, y + height_rect * 0.5,
-                x + width_rect * 0.75, y + height_rect * 0.4,
-                x + width_rect // 2, y + height_rect * 0.75
-            )
-            painter.drawPath(path)
-        
-        elif self.shape == "pentagon":
-            # Draw a pentagon
-            radius = min(width, height) // 2 - 20
-            center_x = width // 2
-            center_y = height // 2
-            
-            # Create a 5-sided polygon
-            points = []
-            for i in range(5):
-                angle = (i * 72 - 90) * 3.14159 / 180  # Start from the top
-                x = center_x + int(radius * math.cos(angle))
-                y = center_y + int(radius * math.sin(angle))
-                points.append(QPoint(x, y))
-            
-            painter.drawPolygon(*points)
-            
-        elif self.shape == "hexagon":
-            # Draw a hexagon
-            radius = min(width, height) // 2 - 20
-            center_x = width // 2
-            center_y = height // 2
-            
-            # Create a 6-sided polygon
-            points = []
-            for i in range(6):
-                angle = (i * 60) * 3.14159 / 180
-                x = center_x + int(radius * math.cos(angle))
-                y = center_y + int(radius * math.sin(angle))
-                points.append(QPoint(x, y))
-            
-            painter.drawPolygon(*points)
-            
-        elif self.shape == "octagon":
-            # Draw an octagon
-            radius = min(width, height) // 2 - 20
-            center_x = width // 2
-            center_y = height // 2
-            
-            # Create an 8-sided polygon
-            points = []
-            for i in range(8):
-                angle = (i * 45) * 3.14159 / 180
-                x = center_x + int(radius * math.cos(angle))
-                y = center_y + int(radius * math.sin(angle))
-                points.append(QPoint(x, y))
-            
-            painter.drawPolygon(*points)
-            
-        elif self.shape == "diamond":
-            # Draw a diamond (rhombus)
-            width_diamond = min(width, height) - 40
-            height_diamond = width_diamond  # Equal sides
-            
-            center_x = width // 2
-            center_y = height // 2
-            
-            points = [
-                QPoint(center_x, center_y - height_diamond // 2),  # Top
-                QPoint(center_x + width_diamond // 2, center_y),    # Right
-                QPoint(center_x, center_y + height_diamond // 2),   # Bottom
-                QPoint(center_x - width_diamond // 2, center_y)     # Left
-            ]
-            
-            painter.drawPolygon(*points)
+        
+        # Draw shape (blitted from the shared raster cache after the first paint)
+        paint_shape(painter, self.shape, DEFAULT_COLOR, self.width(), self.height(), self.devicePixelRatioF())
+
 
 # Communication between threads
 class VoiceSignals(QObject):
-    result_ready = pyqtSignal(str)
+    result_ready = pyqtSignal(object)  # a voice_utils.Recognition
+    partial_ready = pyqtSignal(str)
     listening_done = pyqtSignal()
 
-class ShapeGame(QMainWindow):
+class ShapeGame(VoiceGateMixin, QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         pygame.mixer.init()
+        # Render any voice hints not cached yet, in the background
+        preload_speech()
+        # Every sound this game makes goes through the shared audio scheduler
+        self.audio = get_audio_scheduler()
         self.score = 0
         self.current_shape = ""
         self.shape_list = SHAPES
@@ -227,8 +104,12 @@ class ShapeGame(QMainWindow):
         
         # Connect signals
         self.signals.result_ready.connect(self.process_voice_result)
+        self.signals.partial_ready.connect(self.show_partial)
         self.signals.listening_done.connect(self.listening_finished)
         
+        # Keep the Answer button locked until the voice model has loaded
+        self.gate_answer_button()
+        
         # Load the first shape
         self.load_random_shape()
         self.update_feature_unlocks()
@@ -393,6 +274,9 @@ class ShapeGame(QMainWindow):
             
     def load_random_shape(self):
         """Load a random shape"""
+        # Drop the prompts still waiting from the previous round
+        self.audio.new_round(self)
+        
         # Choose random shape
         self.current_shape = random.choice(self.shape_list)
         
@@ -411,7 +295,7 @@ class ShapeGame(QMainWindow):
         
         # Voice hints only for basic levels
         if self.score < 10:
-            threading.Thread(target=lambda: speak(question), daemon=True).start()
+            self.audio.say(question, PRIORITY_PROMPT, owner=self)
     
     def check_answer(self):
         """Start the voice recognition process"""
@@ -425,7 +309,10 @@ class ShapeGame(QMainWindow):
     
     def _listen_thread(self):
         """Thread function for voice recognition"""
-        answer = listen()
+        # Stop listening as soon as the right answer is clearly heard
+        accept = keyword_predicate(self.current_shape)
+        answer = listen(vocabulary="shapes", on_partial=self.signals.partial_ready.emit, accept=accept,
+                        alternatives=ANSWER_ALTERNATIVES)
         self.signals.result_ready.emit(answer)
         self.signals.listening_done.emit()
     
@@ -449,38 +336,30 @@ class ShapeGame(QMainWindow):
             self.status_label.setStyleSheet("color: orange;")
             return
         
-        normalized_answer = answer.lower().strip()
-        
-        # Detect negations to avoid false positives
-        negations = ["not", "no", "n't", "never", "none"]
-        contains_negation = any(neg in normalized_answer for neg in negations)
-        contains_correct_word = self.current_shape in normalized_answer
-        
-        if contains_correct_word and not contains_negation:
+        # Accept the answer as a whole word in any likely alternative, unless it is negated ("not a ...")
+        if ANSWER_MATCHER.says_any(answer_texts(answer), self.current_shape):
             # Correct answer
             self.score += 5
             self.status_label.setText(f"Correct! It's a {self.current_shape}. ✅")
             self.status_label.setStyleSheet("color: green;")
             
+            # Play correct sound, then the spoken feedback
+            self.audio.play("correct_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
             if self.score < 10:
-                threading.Thread(target=lambda: speak(f"Correct! It's a {self.current_shape}"), daemon=True).start()
-            
-            # Play correct sound if file exists
-            correct_sound_path = os.path.join(SOUNDS_FOLDER, "correct_answer.wav")
-            if os.path.exists(correct_sound_path):
-                sound = pygame.mixer.Sound(correct_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
+                self.audio.say(f"Correct! It's a {self.current_shape}", PRIORITY_FEEDBACK, owner=self)
             
             self.hint_label.setText("")
         else:
             # Wrong answer
             self.score = max(0, self.score - 2)
             
+            # Play wrong sound, then the spoken feedback
+            self.audio.play("wrong_answer", PRIORITY_FEEDBACK, DEFAULT_VOLUME, owner=self)
+            
             if self.score < 10:
                 self.status_label.setText(f"Oops! It's a {self.current_shape}. ❌")
                 self.status_label.setStyleSheet("color: red;")
-                threading.Thread(target=lambda: speak(f"Oops! It's a {self.current_shape}"), daemon=True).start()
+                self.audio.say(f"Oops! It's a {self.current_shape}", PRIORITY_FEEDBACK, owner=self)
                 self.hint_label.setText("")
             elif 10 <= self.score < 20:
                 self.status_label.setText(f"Oops! It's wrong. ❌")
@@ -490,14 +369,13 @@ class ShapeGame(QMainWindow):
                 self.status_label.setText(f"Oops! It's wrong. ❌")
                 self.status_label.setStyleSheet("color: red;")
                 self.hint_label.setText("")
-            
-            # Play wrong sound if file exists
-            wrong_sound_path = os.path.join(SOUNDS_FOLDER, "wrong_answer.wav")
-            if os.path.exists(wrong_sound_path):
-                sound = pygame.mixer.Sound(wrong_sound_path)
-                sound.set_volume(DEFAULT_VOLUME)
-                sound.play()
         
         # Update score and features
         self.score_label.setText(f"Score: {self.score}")
         self.update_feature_unlocks()
+    
+    def closeEvent(self, event):
+        """Stop this window's sounds and let go of the shared signals"""
+        self.audio.cancel(self)
+        self.release_voice_gate()
+        super().closeEvent(event)
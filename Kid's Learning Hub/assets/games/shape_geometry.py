@@ -0,0 +1,193 @@
+import os
+import math
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPainterPath, QPolygonF, QTransform, QImage, QPainter, QPen, QBrush, QColor
+
+# Shapes are drawn in a square of side min(width, height) - MARGIN, centered in the widget
+MARGIN = 40
+PEN_WIDTH = 3
+
+# Optional raster cache: each (shape, colors, side, DPR) is filled once into
+# an image just big enough for the shape and blitted afterwards.
+# KLH_SHAPE_RASTER_CACHE=0 paints the paths every time instead.
+RASTER_CACHE_ENABLED = os.environ.get("KLH_SHAPE_RASTER_CACHE", "1") != "0"
+RASTER_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+def _polygon(points):
+    path = QPainterPath()
+    path.addPolygon(QPolygonF([QPointF(x, y) for x, y in points]))
+    path.closeSubpath()
+    return path
+
+def _regular_polygon(sides, start_degrees=0):
+    """Regular polygon with radius 0.5 around the origin"""
+    return _polygon([(0.5 * math.cos(math.radians(start_degrees + i * 360 / sides)),
+                      0.5 * math.sin(math.radians(start_degrees + i * 360 / sides)))
+                     for i in range(sides)])
+
+def _star():
+    # Five points: alternate between the outer and inner radius, starting at the top
+    return _polygon([((0.5 if i % 2 == 0 else 0.25) * math.sin(math.radians(i * 36)),
+                      -(0.5 if i % 2 == 0 else 0.25) * math.cos(math.radians(i * 36)))
+                     for i in range(10)])
+
+def _heart():
+    path = QPainterPath()
+    path.moveTo(0, 0.25)
+    path.cubicTo(-0.25, -0.1, -0.5, 0, 0, -0.5)
+    path.cubicTo(0.5, 0, 0.25, -0.1, 0, 0.25)
+    return path
+
+def _ellipse(width, height):
+    path = QPainterPath()
+    path.addEllipse(-width / 2, -height / 2, width, height)
+    return path
+
+def _rect(width, height):
+    path = QPainterPath()
+    path.addRect(-width / 2, -height / 2, width, height)
+    return path
+
+@lru_cache(maxsize=None)
+def unit_shape_path(shape):
+    """
+    Outline of a shape in a unit square centered on the origin
+    (-0.5..0.5 on both axes). Built once per shape.
+    """
+    if shape == "circle":
+        return _ellipse(1, 1)
+    if shape == "square":
+        return _rect(1, 1)
+    if shape == "rectangle":
+        return _rect(1, 0.6)  # Make it rectangular, not square
+    if shape == "triangle":
+        return _polygon([(-0.5, 0.5), (0, -0.5), (0.5, 0.5)])
+    if shape == "star":
+        return _star()
+    if shape == "heart":
+        return _heart()
+    if shape == "pentagon":
+        return _regular_polygon(5, -90)  # Start from the top
+    if shape == "hexagon":
+        return _regular_polygon(6)
+    if shape == "octagon":
+        return _regular_polygon(8)
+    if shape == "diamond":
+        return _polygon([(0, -0.5), (0.5, 0), (0, 0.5), (-0.5, 0)])
+    raise ValueError(f"Unknown shape '{shape}'")
+
+def shape_side(width, height):
+    """Side of the square a shape is drawn in, in a width x height widget"""
+    return min(width, height) - MARGIN
+
+@lru_cache(maxsize=64)
+def sized_shape_path(shape, side):
+    """The shape's outline scaled to 'side', still centered on the origin"""
+    return QTransform.fromScale(side, side).map(unit_shape_path(shape))
+
+@lru_cache(maxsize=64)
+def shape_path(shape, width, height):
+    """The shape's outline laid out in a width x height widget, cached per size"""
+    return QTransform.fromTranslate(width / 2, height / 2).map(sized_shape_path(shape, shape_side(width, height)))
+
+def shape_pen_color(fill):
+    """Outline color for a fill color: a darker shade of it"""
+    return tuple(max(0, c - 50) for c in fill)
+
+def render_shape(shape, fill, pen, side, dpr=1.0):
+    """
+    Paint a shape of the given side into a transparent image of its own,
+    with a PEN_WIDTH border so the outline (and its sharpest corners)
+    fits. Uses QImage, not QPixmap, so it can run outside the GUI thread.
+    """
+    size = round((side + 2 * PEN_WIDTH) * dpr)
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.scale(dpr, dpr)
+    painter.translate(side / 2 + PEN_WIDTH, side / 2 + PEN_WIDTH)
+    painter.setPen(QPen(QColor(*pen), PEN_WIDTH))
+    painter.setBrush(QBrush(QColor(*fill)))
+    painter.drawPath(sized_shape_path(shape, side))
+    painter.end()
+    # Set after painting so the painter above worked in device pixels
+    image.setDevicePixelRatio(dpr)
+    return image
+
+class ShapeRasterCache:
+    def __init__(self, max_bytes=RASTER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (shape, fill, pen, side, dpr) -> QImage, least recently used first
+        self._images = OrderedDict()
+        self._bytes = 0
+
+    def get(self, shape, fill, pen, side, dpr=1.0):
+        key = (shape, tuple(fill), tuple(pen), side, dpr)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        image = render_shape(shape, fill, pen, side, dpr)
+        with self._lock:
+            # Another thread may have rendered the same key meanwhile
+            old_image = self._images.pop(key, None)
+            if old_image is not None:
+                self._bytes -= old_image.sizeInBytes()
+            self._images[key] = image
+            self._bytes += image.sizeInBytes()
+            # Evict the least recently used images beyond the budget
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, old_image = self._images.popitem(last=False)
+                self._bytes -= old_image.sizeInBytes()
+        return image
+
+    def prerender(self, shapes, width, height, dpr=1.0):
+        """Render (shape, fill color) pairs on a background thread"""
+        side = shape_side(width, height)
+        def render_all():
+            for shape, fill in shapes:
+                self.get(shape, fill, shape_pen_color(fill), side, dpr)
+        thread = threading.Thread(target=render_all, daemon=True)
+        thread.start()
+        return thread
+
+# Global raster cache shared by both shape games
+_raster_cache = None
+_raster_cache_lock = threading.Lock()
+
+def get_shape_raster_cache():
+    global _raster_cache
+    with _raster_cache_lock:
+        if _raster_cache is None:
+            _raster_cache = ShapeRasterCache()
+    return _raster_cache
+
+def prerender_shapes(shapes, width, height, dpr=1.0):
+    """Render (shape, fill color) pairs ahead of time, if the raster cache is on"""
+    if RASTER_CACHE_ENABLED and shape_side(width, height) > 0:
+        return get_shape_raster_cache().prerender(shapes, width, height, dpr)
+    return None
+
+def paint_shape(painter, shape, fill, width, height, dpr=1.0):
+    """Paint a shape filling a width x height widget"""
+    pen = shape_pen_color(fill)
+    if RASTER_CACHE_ENABLED:
+        side = shape_side(width, height)
+        if side <= 0:
+            return
+        image = get_shape_raster_cache().get(shape, fill, pen, side, dpr)
+        # Top left of the image, on a device pixel so the blit stays sharp
+        x = round((width / 2 - side / 2 - PEN_WIDTH) * dpr) / dpr
+        y = round((height / 2 - side / 2 - PEN_WIDTH) * dpr) / dpr
+        painter.drawImage(QPointF(x, y), image)
+        return
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(QPen(QColor(*pen), PEN_WIDTH))
+    painter.setBrush(QBrush(QColor(*fill)))
+    painter.drawPath(shape_path(shape, width, height))
@@ -0,0 +1,138 @@
+import os
+import sys
+import math
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor
+# We need to adjust import to go up one level in the folder structure
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from image_cache import get_scaled_pixmap
+
+# Ways of grouping the tiles: name -> (rows, columns) of tiles in one group
+GROUPINGS = {
+    "grid": (1, 1),          # plain grid
+    "rows_of_five": (1, 5),  # rows of five with a gap after each five
+    "tens_frames": (2, 5),   # ten frames: 2 x 5 boxes, outlined
+}
+
+# Tile sizes are rounded down to this step so resizing the window only
+# ever asks the image cache for a handful of sizes
+TILE_STEP = 4
+MIN_TILE = 8
+
+def compute_tile_layout(count, width, height, grouping="grid", spacing=10, max_tile=120):
+    """
+    Lay out 'count' tiles in 'width' x 'height' pixels.
+    Returns (tile size, tile rects, group rects) with the largest tile size
+    that fits, trying every number of group columns.
+    """
+    if count <= 0 or width <= 0 or height <= 0:
+        return 0, [], []
+    group_rows, group_cols = GROUPINGS[grouping]
+    group_size = group_rows * group_cols
+    groups = math.ceil(count / group_size)
+    # Groups are set apart by a wider gap than tiles within a group
+    gap = spacing if group_size == 1 else spacing * 3
+
+    best_tile, best_columns = 0, 1
+    for columns in range(1, groups + 1):
+        rows = math.ceil(groups / columns)
+        tile_width = (width - columns * (group_cols - 1) * spacing - (columns - 1) * gap) / (columns * group_cols)
+        tile_height = (height - rows * (group_rows - 1) * spacing - (rows - 1) * gap) / (rows * group_rows)
+        tile = min(tile_width, tile_height, max_tile)
+        if tile >= best_tile:
+            best_tile, best_columns = tile, columns
+    tile = max(MIN_TILE, int(best_tile) // TILE_STEP * TILE_STEP)
+
+    columns = min(best_columns, groups)
+    rows = math.ceil(groups / columns)
+    group_width = group_cols * tile + (group_cols - 1) * spacing
+    group_height = group_rows * tile + (group_rows - 1) * spacing
+    # Center the whole arrangement
+    left = (width - (columns * group_width + (columns - 1) * gap)) / 2
+    top = (height - (rows * group_height + (rows - 1) * gap)) / 2
+
+    tiles, group_rects = [], []
+    for group in range(groups):
+        x = left + (group % columns) * (group_width + gap)
+        y = top + (group // columns) * (group_height + gap)
+        group_rects.append(QRectF(x, y, group_width, group_height))
+        for index in range(group * group_size, min(count, (group + 1) * group_size)):
+            cell = index - group * group_size
+            tiles.append(QRectF(x + (cell % group_cols) * (tile + spacing),
+                                y + (cell // group_cols) * (tile + spacing), tile, tile))
+    return tile, tiles, group_rects
+
+class TiledImageWidget(QWidget):
+    """
+    Shows one picture 'count' times, painted from a single cached pixmap,
+    so a challenge is one widget however many items it has.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image_path = None
+        self.count = 0
+        self.grouping = "grid"
+        self.spacing = 10
+        self.max_tile = 120
+        self._pixmap = None
+        self._tiles = []
+        self._groups = []
+        self._tile = 0
+
+    def set_tiles(self, image_path, count, grouping="grid", max_tile=120):
+        """Show 'count' copies of the image at 'image_path'"""
+        self.image_path = image_path
+        self.count = count
+        self.grouping = grouping
+        self.max_tile = max_tile
+        self.relayout()
+
+    def clear(self):
+        self.set_tiles(None, 0)
+
+    def relayout(self):
+        """Recompute the tile positions for the current size"""
+        self._tile, self._tiles, self._groups = compute_tile_layout(
+            self.count, self.width(), self.height(), self.grouping, self.spacing, self.max_tile)
+        if self.image_path and self._tile:
+            self._pixmap = get_scaled_pixmap(self.image_path, self._tile, self._tile, self.devicePixelRatioF())
+        else:
+            self._pixmap = None
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.relayout()
+
+    def paintEvent(self, event):
+        if not self._tiles:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Ten frames: outline every frame and its ten boxes, so empty boxes show what's missing
+        if self.grouping == "tens_frames":
+            group_rows, group_cols = GROUPINGS[self.grouping]
+            painter.setPen(QPen(QColor("#bdc3c7"), 1))
+            painter.setBrush(Qt.NoBrush)
+            for group in self._groups:
+                for cell in range(group_rows * group_cols):
+                    painter.drawRect(QRectF(group.x() + (cell % group_cols) * (self._tile + self.spacing),
+                                            group.y() + (cell // group_cols) * (self._tile + self.spacing),
+                                            self._tile, self._tile))
+                painter.setPen(QPen(QColor("#7f8c8d"), 2))
+                margin = self.spacing / 2
+                painter.drawRoundedRect(group.adjusted(-margin, -margin, margin, margin), 6, 6)
+                painter.setPen(QPen(QColor("#bdc3c7"), 1))
+
+        if self._pixmap is not None and not self._pixmap.isNull():
+            # The pixmap keeps its aspect ratio: center it in each tile
+            dpr = self._pixmap.devicePixelRatio()
+            width = self._pixmap.width() / dpr
+            height = self._pixmap.height() / dpr
+            for tile in self._tiles:
+                painter.drawPixmap(QRectF(tile.x() + (tile.width() - width) / 2,
+                                          tile.y() + (tile.height() - height) / 2, width, height),
+                                   self._pixmap, QRectF(self._pixmap.rect()))
+        painter.end()
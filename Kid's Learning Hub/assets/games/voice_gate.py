@@ -0,0 +1,58 @@
+import os
+import sys
+# We need to adjust import to go up one level in the folder structure
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from voice_utils import is_model_ready, model_error, preload_model, model_signals
+
+class VoiceGateMixin:
+    """
+    Answer button and live transcript handling shared by the voice games.
+    The game window needs an 'answer_button', a 'hint_label' and a
+    'user_speech_label'.
+    """
+    def gate_answer_button(self):
+        """Keep the Answer button locked until the voice model has loaded"""
+        model_signals.progress.connect(self.voice_loading)
+        model_signals.ready.connect(self.voice_ready)
+        model_signals.failed.connect(self.voice_failed)
+        if is_model_ready():
+            self.voice_ready()
+        elif model_error() is not None:
+            # The load already failed before this window was opened
+            self.voice_failed(model_error())
+        else:
+            self.answer_button.setEnabled(False)
+            self.answer_button.setText("Loading voice... ⏳")
+            preload_model()
+
+    def release_voice_gate(self):
+        """Unhook this window from the shared model signals when it closes"""
+        for signal, slot in ((model_signals.progress, self.voice_loading),
+                             (model_signals.ready, self.voice_ready),
+                             (model_signals.failed, self.voice_failed)):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                # Not connected (already released)
+                pass
+
+    def show_partial(self, text):
+        """Show what the child is saying while they are still talking"""
+        self.user_speech_label.setText(f"Hearing: \"{text}\"...")
+        self.user_speech_label.setVisible(True)
+
+    def voice_loading(self, percent, message):
+        """Show the voice model loading progress on the Answer button"""
+        if not is_model_ready():
+            self.answer_button.setText(f"Loading voice... {percent}% ⏳")
+
+    def voice_ready(self):
+        """Called once the voice model is loaded and warmed up"""
+        self.answer_button.setText("Answer 🎤")
+        self.answer_button.setEnabled(True)
+
+    def voice_failed(self, message):
+        """Called if the voice model could not be loaded"""
+        self.answer_button.setText("Voice unavailable 🚫")
+        self.answer_button.setEnabled(False)
+        self.hint_label.setText(message)
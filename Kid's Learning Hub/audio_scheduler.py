@@ -0,0 +1,223 @@
+"""
+Single owner of audio output.
+
+Every prompt, spoken hint and feedback chime goes through one scheduler
+thread instead of being played wherever it was triggered, so sounds no
+longer talk over each other. Requests wait in a priority queue (feedback
+before prompts before ambience, first come first served within a
+priority) and play one at a time. A request with a higher priority than
+the one playing cuts it off. new_round() drops what a game queued for its
+previous round, so a stale question never plays after "Next". Starts and
+ends of playback are reported through the scheduler's Qt signals.
+
+The scheduler thread never synthesizes speech: a phrase whose clip is not
+cached yet is rendered on a thread of its own and queued again (keeping
+its place), while other sounds go on playing.
+"""
+import heapq
+import itertools
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from sound_bank import get_sound_bank
+from speech_cache import cached_clip, speech_clip, can_render
+
+# Priorities, most urgent first
+PRIORITY_FEEDBACK = 0
+PRIORITY_PROMPT = 1
+PRIORITY_AMBIENCE = 2
+
+# How often the scheduler checks whether the playing sound has ended (seconds).
+# Only used while something is playing; an idle scheduler sleeps until notified.
+POLL_INTERVAL = 0.02
+
+class PlayRequest:
+    """One sound (a sound bank key) or phrase (spoken text) waiting to be played"""
+    __slots__ = ("id", "priority", "key", "text", "volume", "owner", "channel", "cancelled", "deferred")
+
+    def __init__(self, request_id, priority, key=None, text=None, volume=None, owner=None):
+        self.id = request_id
+        self.priority = priority
+        self.key = key
+        self.text = text
+        self.volume = volume
+        self.owner = owner
+        self.channel = None
+        self.cancelled = False
+        self.deferred = False   # set once its clip has been sent off to be rendered
+
+class AudioScheduler(QObject):
+    # Request id; and request id plus whether it played to the end
+    started = pyqtSignal(int)
+    finished = pyqtSignal(int, bool)
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        # (priority, request id, request); ids grow, so equal priorities play in order
+        self._queue = []
+        self._current = None
+        # Phrases taken off the queue while their clip is being rendered
+        self._rendering = []
+        self._ids = itertools.count(1)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def play(self, key, priority=PRIORITY_PROMPT, volume=None, owner=None):
+        """Queue the sound bank sound 'key'; returns the request id"""
+        return self._submit(PlayRequest(next(self._ids), priority, key=key, volume=volume, owner=owner))
+
+    def say(self, text, priority=PRIORITY_PROMPT, owner=None):
+        """Queue 'text' to be spoken from the speech cache; returns the request id"""
+        print(f"Speaking: {text}")
+        return self._submit(PlayRequest(next(self._ids), priority, text=text, owner=owner))
+
+    def cancel(self, owner=None, priorities=None, playing=True):
+        """
+        Drop the queued requests of 'owner' (every owner if None) with one
+        of 'priorities' (any if None), and stop the playing one if it matches
+        (unless 'playing' is False)
+        """
+        def matches(request):
+            return ((owner is None or request.owner is owner)
+                    and (priorities is None or request.priority in priorities))
+        with self._cond:
+            dropped = [request for _, _, request in self._queue if matches(request)]
+            self._queue = [entry for entry in self._queue if not matches(entry[2])]
+            heapq.heapify(self._queue)
+            for request in self._rendering:
+                if matches(request):
+                    request.cancelled = True
+                    dropped.append(request)
+            self._rendering = [request for request in self._rendering if not request.cancelled]
+            current = self._current
+            if current is not None and playing and matches(current):
+                self._stop_current()
+            else:
+                current = None
+            self._cond.notify()
+        for request in dropped:
+            self.finished.emit(request.id, False)
+        if current is not None:
+            self.finished.emit(current.id, False)
+
+    def new_round(self, owner):
+        """
+        Forget what 'owner' queued for its previous round. Feedback that is
+        already playing may finish, but feedback still waiting (say behind a
+        long clip, or for its phrase to render) would now be about the wrong
+        question, so it is dropped too.
+        """
+        self.cancel(owner, (PRIORITY_PROMPT, PRIORITY_AMBIENCE))
+        self.cancel(owner, (PRIORITY_FEEDBACK,), playing=False)
+
+    def close(self):
+        """Stop playback and the scheduler thread"""
+        self.cancel()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def _submit(self, request):
+        with self._cond:
+            heapq.heappush(self._queue, (request.priority, request.id, request))
+            self._cond.notify()
+        return request.id
+
+    def _stop_current(self):
+        # Called with the lock held
+        self._current.cancelled = True
+        if self._current.channel is not None:
+            self._current.channel.stop()
+        self._current = None
+
+    def _run(self):
+        """Scheduler thread: start the most urgent request whenever it may play"""
+        while True:
+            ended = preempted = request = None
+            with self._cond:
+                if not self._running:
+                    return
+                current = self._current
+                if current is not None and (current.channel is None or not current.channel.get_busy()):
+                    ended, self._current = current, None
+                if self._queue and (self._current is None or self._queue[0][0] < self._current.priority):
+                    if self._current is not None:
+                        preempted = self._current
+                        self._stop_current()
+                    request = heapq.heappop(self._queue)[2]
+                    self._current = request
+                elif ended is None:
+                    if self._current is not None:
+                        # Channels don't report when they end, so poll the playing one
+                        self._cond.wait(POLL_INTERVAL)
+                    else:
+                        # Idle: submit, cancel, close and finished renders all notify
+                        self._cond.wait()
+            if ended is not None:
+                self.finished.emit(ended.id, ended.channel is not None)
+            if preempted is not None:
+                self.finished.emit(preempted.id, False)
+            if request is not None:
+                self._start(request)
+
+    def _start(self, request):
+        """Play a request that was just taken off the queue (outside the lock)"""
+        key = request.key
+        if request.text is not None:
+            key = cached_clip(request.text)
+            if key is None and not request.deferred and can_render():
+                self._render_later(request)
+                return
+        channel = get_sound_bank().play(key, request.volume) if key is not None else None
+        with self._cond:
+            if request.cancelled:
+                # Cancelled or preempted while its clip was being prepared
+                if channel is not None:
+                    channel.stop()
+                return
+            request.channel = channel
+        if channel is not None:
+            self.started.emit(request.id)
+        # A request with nothing to play ends on the scheduler's next pass
+
+    def _render_later(self, request):
+        """Set a phrase aside while its clip is rendered, so other sounds can play"""
+        with self._cond:
+            if request.cancelled:
+                return
+            request.deferred = True
+            if self._current is request:
+                self._current = None
+            self._rendering.append(request)
+            self._cond.notify()
+        threading.Thread(target=self._render, args=(request,), daemon=True).start()
+
+    def _render(self, request):
+        """Render thread: render a phrase's clip, then queue the phrase again"""
+        speech_clip(request.text)
+        with self._cond:
+            if request not in self._rendering:
+                # Cancelled meanwhile
+                return
+            self._rendering.remove(request)
+            # Its id keeps its place among the requests of the same priority.
+            # If rendering failed it has nothing to play and ends straight away.
+            heapq.heappush(self._queue, (request.priority, request.id, request))
+            self._cond.notify()
+
+# Global scheduler shared by every game window
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_audio_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AudioScheduler()
+    return _scheduler
+
+def speak(text, priority=PRIORITY_PROMPT, owner=None):
+    """Queue 'text' to be spoken; returns the request id"""
+    return get_audio_scheduler().say(text, priority, owner)
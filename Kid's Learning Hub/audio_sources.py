@@ -0,0 +1,190 @@
+"""
+Audio input backends for voice_utils.
+
+Every source delivers 16-bit mono audio at the capture session's sample
+rate, one chunk at a time. Besides the live microphone there is a WAV
+replay source, so whole rounds can be driven from recorded answers on
+machines without a microphone, and a silent source.
+
+The source is picked with the KLH_AUDIO_SOURCE environment variable:
+    mic                     the default microphone (default)
+    null                    silence
+    wav:<file or folder>    recordings, one per listening turn; several
+                            paths can be separated with os.pathsep
+KLH_AUDIO_REALTIME=0 replays recordings as fast as they can be decoded
+instead of at real-time speed.
+"""
+import os
+import time
+import wave
+import array
+
+class AudioSource:
+    """Base class for audio input backends"""
+    # Live sources produce audio on their own clock and can stay armed between turns
+    live = False
+
+    def open(self, rate, chunk):
+        self.rate = rate
+        self.chunk = chunk
+
+    def start(self):
+        """Called when a turn starts on a source that is not kept running"""
+
+    def stop(self):
+        """Called when that turn ends"""
+
+    def next_turn(self):
+        """Called at the start of every listening turn"""
+
+    def read(self, frames):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PyAudioSource(AudioSource):
+    """The default microphone, through PyAudio"""
+    live = True
+
+    def __init__(self, buffer_frames=8192):
+        self.buffer_frames = buffer_frames
+        self._mic = None
+        self._stream = None
+
+    def open(self, rate, chunk):
+        super().open(rate, chunk)
+        if self._stream is None:
+            import pyaudio
+            self._mic = pyaudio.PyAudio()
+            self._stream = self._mic.open(format=pyaudio.paInt16, channels=1, rate=rate, input=True,
+                                          frames_per_buffer=self.buffer_frames, start=False)
+
+    def start(self):
+        if not self._stream.is_active():
+            self._stream.start_stream()
+
+    def stop(self):
+        if self._stream is not None and self._stream.is_active():
+            self._stream.stop_stream()
+
+    def read(self, frames):
+        return self._stream.read(frames, exception_on_overflow=False)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._mic is not None:
+            self._mic.terminate()
+            self._mic = None
+
+class _PacedSource(AudioSource):
+    """
+    Shared real-time pacing for the synthetic sources. Even when paced
+    they are not live: they are only read during a turn, so next_turn()
+    never races a capture thread.
+    """
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self._clock_start = None
+        self._frames_sent = 0
+
+    def start(self):
+        # Don't try to catch up on the time spent between turns
+        self._clock_start = None
+        self._frames_sent = 0
+
+    def _pace(self, frames):
+        if not self.realtime:
+            return
+        if self._clock_start is None:
+            self._clock_start = time.monotonic()
+        self._frames_sent += frames
+        delay = self._clock_start + self._frames_sent / self.rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+class NullSource(_PacedSource):
+    """Silence, at real-time speed or as fast as it is read"""
+    def read(self, frames):
+        self._pace(frames)
+        return bytes(frames * 2)
+
+class WavFileSource(_PacedSource):
+    """
+    Replays recorded answers: each listening turn gets the next recording
+    (cycling through the list if 'loop' is set), followed by silence so
+    the endpointer can end the turn.
+    """
+    def __init__(self, paths, realtime=True, loop=True):
+        super().__init__(realtime)
+        self.paths = list(paths)
+        self.loop = loop
+        self.current_path = None
+        self._index = 0
+        self._audio = b""
+        self._offset = 0
+
+    def next_turn(self):
+        if self._index >= len(self.paths):
+            if not self.loop or not self.paths:
+                self.current_path = None
+                self._audio = b""
+                self._offset = 0
+                return
+            self._index = 0
+        self.current_path = self.paths[self._index]
+        self._index += 1
+        self._audio = load_wav(self.current_path, self.rate)
+        self._offset = 0
+
+    def read(self, frames):
+        self._pace(frames)
+        size = frames * 2
+        data = self._audio[self._offset:self._offset + size]
+        self._offset += size
+        if len(data) < size:
+            data += bytes(size - len(data))
+        return data
+
+def load_wav(path, rate):
+    """Read a WAV file as 16-bit mono PCM at 'rate', downmixing and resampling if needed"""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        channels = wav.getnchannels()
+        source_rate = wav.getframerate()
+        samples = array.array("h", wav.readframes(wav.getnframes()))
+    if channels > 1:
+        samples = samples[::channels]
+    if source_rate != rate:
+        # Nearest-neighbour resampling is plenty for replaying test answers
+        count = int(len(samples) * rate / source_rate)
+        samples = array.array("h", (samples[int(i * source_rate / rate)] for i in range(count)))
+    return samples.tobytes()
+
+def _wav_paths(spec):
+    paths = []
+    for part in spec.split(os.pathsep):
+        if os.path.isdir(part):
+            paths.extend(sorted(os.path.join(part, name) for name in os.listdir(part)
+                                if name.lower().endswith(".wav")))
+        elif part:
+            paths.append(part)
+    return paths
+
+def create_audio_source(spec=None, realtime=None):
+    """Build the audio source described by 'spec' (default: KLH_AUDIO_SOURCE)"""
+    if spec is None:
+        spec = os.environ.get("KLH_AUDIO_SOURCE", "mic")
+    if realtime is None:
+        realtime = os.environ.get("KLH_AUDIO_REALTIME", "1") != "0"
+
+    if spec == "mic":
+        return PyAudioSource()
+    if spec == "null":
+        return NullSource(realtime)
+    if spec.startswith("wav:"):
+        return WavFileSource(_wav_paths(spec[len("wav:"):]), realtime)
+    raise ValueError(f"Unknown audio source '{spec}' (use mic, null or wav:<path>)")
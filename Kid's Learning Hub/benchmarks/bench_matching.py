@@ -0,0 +1,85 @@
+"""
+Microbenchmark and regression check for answer matching.
+
+Runs every case in matching_corpus.json through answer_matching (the
+matcher the games use, with its phonetic fallback for near-misses such
+as "zeebra") and fails if any answer is judged
+differently than expected. Then times the matcher against the old
+substring check the games used before.
+
+Usage:
+    python benchmarks/bench_matching.py [--corpus FILE] [--repeat N] [--output FILE]
+        [--baseline FILE [--tolerance 0.10]]
+"""
+import os
+import sys
+import json
+import argparse
+
+from bench_utils import percentiles, timed, write_results, compare_to_baseline, print_metrics
+from answer_matching import get_matcher
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "matching_corpus.json")
+
+def legacy_says(text, target):
+    """The substring check every process_voice_result used to do"""
+    normalized_answer = text.lower().strip()
+    negations = ["not", "no", "n't", "never", "none"]
+    contains_negation = any(neg in normalized_answer for neg in negations)
+    return target in normalized_answer and not contains_negation
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="regression corpus (JSON)")
+    parser.add_argument("--repeat", type=int, default=200, help="how many times to time each case")
+    parser.add_argument("--output", default="matching_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+    matchers = {name: get_matcher(words, fuzzy=True) for name, words in corpus["vocabularies"].items()}
+    cases = corpus["cases"]
+
+    failures = []
+    legacy_wrong = 0
+    for case in cases:
+        result = matchers[case["vocabulary"]].says(case["text"], case["target"])
+        if result != case["expected"]:
+            failures.append(case)
+            print(f"FAIL {case['text']!r} -> {case['target']}: got {result} ({case['note']})")
+        if legacy_says(case["text"], case["target"]) != case["expected"]:
+            legacy_wrong += 1
+    print(f"{len(cases) - len(failures)}/{len(cases)} cases pass "
+          f"(the old substring check got {legacy_wrong} wrong)")
+
+    # Per-call times in microseconds
+    samples = {"match_us": [], "legacy_match_us": []}
+    for case in cases:
+        matcher = matchers[case["vocabulary"]]
+        for _ in range(args.repeat):
+            samples["match_us"].append(timed(matcher.says, case["text"], case["target"])[1] * 1e6)
+            samples["legacy_match_us"].append(timed(legacy_says, case["text"], case["target"])[1] * 1e6)
+    metrics = {name: percentiles(values) for name, values in samples.items()}
+    print_metrics(metrics)
+
+    write_results(args.output, "matching", {
+        "config": {"cases": len(cases), "repeat": args.repeat},
+        "failures": [case["text"] for case in failures],
+        "legacy_wrong": legacy_wrong,
+        "metrics": metrics,
+    })
+
+    if failures:
+        return 1
+    if args.baseline:
+        print(f"\nCompared with {args.baseline}:")
+        regressions = compare_to_baseline(metrics, args.baseline, args.tolerance)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Microbenchmark and regression check for the number parser.
+
+Runs every case below through answer_matching.parse_numbers (what
+CountNumbersGame checks answers with) and fails if any answer reads as
+different numbers than expected. Then times the parser against the old
+substring check, which found "seven" in "seventeen" and stopped at 15.
+
+Usage:
+    python benchmarks/bench_numbers.py [--repeat N] [--output FILE]
+        [--baseline FILE [--tolerance 0.10]]
+"""
+import sys
+import argparse
+
+from bench_utils import percentiles, timed, write_results, compare_to_baseline, print_metrics
+from answer_matching import parse_numbers
+
+# (answer, numbers it says)
+CASES = [
+    ("five", [5]),
+    ("seventeen", [17]),
+    ("fourteen", [14]),
+    ("fifteen", [15]),
+    ("twenty three", [23]),
+    ("twenty-three", [23]),
+    ("ninety nine", [99]),
+    ("one hundred", [100]),
+    ("a hundred", [100]),
+    ("one hundred and five", [105]),
+    ("three hundred twelve", [312]),
+    ("a dozen", [12]),
+    ("two dozen", [24]),
+    ("half a dozen", [6]),
+    ("42", [42]),
+    ("there are 7 apples", [7]),
+    ("i think forty two apples", [42]),
+    ("one two three four five", [1, 2, 3, 4, 5]),
+    ("twenty thirty", [20, 30]),
+    ("not five six", []),
+    ("not five, it's six", [6]),
+    ("not twenty three but twenty four", [24]),
+    ("no it's eight", [8]),
+    ("zero", [0]),
+    ("i don't know", []),
+]
+
+# The numbers the old check knew about
+LEGACY_NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+}
+
+def legacy_says(text, number):
+    """The substring check CountNumbersGame used to do"""
+    normalized_answer = text.lower().strip()
+    for word, value in LEGACY_NUMBER_WORDS.items():
+        if word in normalized_answer and value == number:
+            return True
+    return str(number) in normalized_answer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="how many times to time each case")
+    parser.add_argument("--output", default="numbers_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    failures = []
+    legacy_wrong = 0
+    for text, expected in CASES:
+        result = parse_numbers(text)
+        if result != expected:
+            failures.append(text)
+            print(f"FAIL {text!r}: got {result}, expected {expected}")
+        # The old check answered "is it N?" for one N: ask it about every number in play
+        for number in set(expected) | set(LEGACY_NUMBER_WORDS.values()):
+            if legacy_says(text, number) != (number in expected):
+                legacy_wrong += 1
+                break
+    print(f"{len(CASES) - len(failures)}/{len(CASES)} cases pass "
+          f"(the old substring check got {legacy_wrong} wrong)")
+
+    # Per-call times in microseconds
+    samples = {"parse_us": [], "legacy_check_us": []}
+    for text, expected in CASES:
+        number = expected[0] if expected else 1
+        for _ in range(args.repeat):
+            samples["parse_us"].append(timed(parse_numbers, text)[1] * 1e6)
+            samples["legacy_check_us"].append(timed(legacy_says, text, number)[1] * 1e6)
+    metrics = {name: percentiles(values) for name, values in samples.items()}
+    print_metrics(metrics)
+
+    write_results(args.output, "numbers", {
+        "config": {"cases": len(CASES), "repeat": args.repeat},
+        "failures": failures,
+        "legacy_wrong": legacy_wrong,
+        "metrics": metrics,
+    })
+
+    if failures:
+        return 1
+    if args.baseline:
+        print(f"\nCompared with {args.baseline}:")
+        regressions = compare_to_baseline(metrics, args.baseline, args.tolerance)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
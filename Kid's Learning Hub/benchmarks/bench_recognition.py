@@ -0,0 +1,207 @@
+"""
+End-to-end latency benchmark for the speech recognition pipeline.
+
+Replays a corpus of recorded answers through voice_utils.listen_detailed
+(and optionally each game's process_voice_result) and reports model load
+time, time-to-first-partial, endpoint latency, decode time and real-time
+factor as percentiles, plus recognition accuracy.
+
+Corpus layout: <corpus>/<vocabulary>/<expected answer>[_<take>].wav
+where <vocabulary> is one the games register (objects, colors, animals,
+shapes, numbers), e.g. corpus/animals/cat_01.wav or corpus/numbers/seven.wav
+
+Usage:
+    python benchmarks/bench_recognition.py <corpus> [--output FILE] [--label NAME]
+        [--no-grammar] [--early-accept] [--realtime] [--games] [--alternatives N]
+        [--baseline FILE [--tolerance 0.10]]
+"""
+import os
+import sys
+import argparse
+import importlib
+
+# Headless runs: no window and no sound card needed
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from bench_utils import percentiles, timed, write_results, compare_to_baseline, print_metrics
+import voice_utils
+from answer_matching import parse_numbers
+from audio_sources import WavFileSource
+
+# Game module and class for each vocabulary
+GAMES = {
+    "objects": ("assets.games.name_object_game", "NameObjectGame"),
+    "colors": ("assets.games.color_game_shapes", "ColorGame"),
+    "animals": ("assets.games.animal_sound_game", "AnimalSoundGame"),
+    "shapes": ("assets.games.shape_game", "ShapeGame"),
+    "numbers": ("assets.games.count_numbers_game", "CountNumbersGame"),
+}
+
+def load_corpus(corpus_dir):
+    """Return a list of (vocabulary, expected answer, wav path)"""
+    corpus = []
+    for vocabulary in sorted(os.listdir(corpus_dir)):
+        folder = os.path.join(corpus_dir, vocabulary)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(".wav"):
+                expected = os.path.splitext(name)[0].split("_")[0].replace("-", " ")
+                corpus.append((vocabulary, expected, os.path.join(folder, name)))
+    return corpus
+
+def early_accept_predicate(vocabulary, expected):
+    """accept() function for listen_detailed() that ends a turn on the expected answer, like the games"""
+    if vocabulary == "numbers":
+        from assets.games.count_numbers_game import LARGEST_NUMBER
+        return voice_utils.number_predicate(parse_numbers(expected)[0], LARGEST_NUMBER)
+    return voice_utils.keyword_predicate(expected)
+
+def answer_predicate(vocabulary, expected):
+    """Function that is true when a final transcript says the expected answer"""
+    if vocabulary == "numbers":
+        number = parse_numbers(expected)[0]
+        # A final transcript is complete, so "twenty" cannot grow any more
+        return lambda text: number in parse_numbers(text)
+    return voice_utils.keyword_predicate(expected)
+
+def set_game_target(game, vocabulary, expected):
+    """Point a game's current round at the expected answer"""
+    if vocabulary in ("objects", "animals"):
+        game.current["correct_answer"] = expected
+    elif vocabulary == "shapes":
+        game.current_shape = expected
+    elif vocabulary == "colors":
+        game.current_color = expected
+    elif vocabulary == "numbers":
+        game.current_count = parse_numbers(expected)[0]
+    game.score = 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", help="folder of recorded answers (see layout above)")
+    parser.add_argument("--output", default="recognition_results.json", help="where to write the JSON results")
+    parser.add_argument("--label", default="", help="name of the configuration being measured")
+    parser.add_argument("--no-grammar", action="store_true", help="decode with the open vocabulary")
+    parser.add_argument("--early-accept", action="store_true", help="end turns on a stable keyword partial")
+    parser.add_argument("--realtime", action="store_true", help="replay at real-time speed instead of flat out")
+    parser.add_argument("--timeout", type=float, default=5, help="maximum turn length in seconds")
+    parser.add_argument("--games", action="store_true", help="also time each game's process_voice_result")
+    parser.add_argument("--alternatives", type=int, default=0,
+                        help="ask for N-best alternatives and also count answers found in them")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"No recordings found in {args.corpus}")
+        return 1
+
+    # Importing the games registers their vocabularies
+    for module_name, _ in GAMES.values():
+        importlib.import_module(module_name)
+
+    _, model_load = timed(voice_utils.load_recognizer_backend)
+    print(f"Model load: {model_load:.2f}s")
+
+    source = WavFileSource([path for _, _, path in corpus], realtime=args.realtime, loop=False)
+    voice_utils.set_audio_source(source)
+
+    games = {}
+    if args.games:
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)
+        for vocabulary in set(v for v, _, _ in corpus):
+            module_name, class_name = GAMES[vocabulary]
+            games[vocabulary] = getattr(sys.modules[module_name], class_name)()
+
+    samples = []
+    for vocabulary, expected, path in corpus:
+        accept = early_accept_predicate(vocabulary, expected) if args.early_accept else None
+        result, wall_time = timed(voice_utils.listen_detailed, args.timeout,
+                                  None if args.no_grammar else vocabulary,
+                                  on_partial=lambda text: None, accept=accept,
+                                  alternatives=args.alternatives)
+        recognition = voice_utils.Recognition(result["text"], result["alternatives"], result["words"])
+        recognized = answer_predicate(vocabulary, expected)
+        sample = {
+            "file": os.path.relpath(path, args.corpus),
+            "vocabulary": vocabulary,
+            "expected": expected,
+            "text": result["text"],
+            "end_reason": result["end_reason"],
+            "audio_seconds": result["duration"],
+            "wall_seconds": wall_time,
+            "decode_seconds": result["decode_time"],
+            "real_time_factor": result["decode_time"] / result["duration"] if result["duration"] else None,
+            "time_to_first_partial": result["first_partial_at"],
+            "endpoint_latency": (result["duration"] - result["speech_end_at"]
+                                 if result["speech_end_at"] is not None else None),
+            "recognized": recognized(result["text"]),
+            "alternatives": [alternative["text"] for alternative in result["alternatives"]],
+            "recognized_in_alternatives": any(recognized(text) for text in recognition.texts()),
+        }
+        if vocabulary in games:
+            game = games[vocabulary]
+            set_game_target(game, vocabulary, expected)
+            _, sample["match_seconds"] = timed(game.process_voice_result, recognition)
+            sample["game_accepted"] = game.score > 0
+            # Deliver the signals the game queued (audio scheduler, voice model)
+            app.processEvents()
+        samples.append(sample)
+        print(f"{sample['file']:<32} {result['text']!r:<24} {result['end_reason']:<13} "
+              f"rtf={sample['real_time_factor'] or 0:.3f}")
+
+    metrics = {
+        "time_to_first_partial": percentiles(s["time_to_first_partial"] for s in samples),
+        "endpoint_latency": percentiles(s["endpoint_latency"] for s in samples),
+        "decode_time": percentiles(s["decode_seconds"] for s in samples),
+        "real_time_factor": percentiles(s["real_time_factor"] for s in samples),
+        "turn_wall_time": percentiles(s["wall_seconds"] for s in samples),
+    }
+    if games:
+        metrics["match_time"] = percentiles(s.get("match_seconds") for s in samples)
+
+    accuracy = {}
+    for vocabulary in sorted(set(s["vocabulary"] for s in samples)):
+        group = [s for s in samples if s["vocabulary"] == vocabulary]
+        accuracy[vocabulary] = sum(s["recognized"] for s in group) / len(group)
+        if args.alternatives:
+            accuracy[f"{vocabulary}_alternatives"] = sum(s["recognized_in_alternatives"] for s in group) / len(group)
+
+    print(f"\nModel load: {model_load:.2f}s")
+    print_metrics(metrics)
+    for vocabulary, value in accuracy.items():
+        print(f"  accuracy {vocabulary:<15} {value:.1%}")
+
+    write_results(args.output, "recognition", {
+        "label": args.label,
+        "config": {
+            "asr_mode": voice_utils.ASR_MODE,
+            "grammar": not args.no_grammar,
+            "early_accept": args.early_accept,
+            "realtime": args.realtime,
+            "timeout": args.timeout,
+            "trailing_silence": voice_utils.TRAILING_SILENCE,
+            "keyword_stable_chunks": voice_utils.KEYWORD_STABLE_CHUNKS,
+            "alternatives": args.alternatives,
+            "alternative_floor": voice_utils.ALTERNATIVE_FLOOR,
+        },
+        "model_load_seconds": model_load,
+        "metrics": metrics,
+        "accuracy": accuracy,
+        "samples": samples,
+    })
+
+    if args.baseline:
+        print(f"\nCompared with {args.baseline}:")
+        regressions = compare_to_baseline(metrics, args.baseline, args.tolerance)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Load-time benchmark for the animal sounds.
+
+Compares decoding every clip with pygame.mixer.Sound(path), as the game
+used to do on every play, with building and reading the pre-decoded
+sound pack, and with fetching a sound from the shared bank.
+
+Usage:
+    python benchmarks/bench_sounds.py [--repeat N] [--output FILE] [--baseline FILE [--tolerance 0.10]]
+"""
+import os
+import sys
+import tempfile
+import argparse
+
+# Headless runs: no sound card needed
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from bench_utils import percentiles, timed, write_results, compare_to_baseline, print_metrics
+import pygame
+import sound_bank
+from assets.games.animal_sound_game import ANIMAL_SOUNDS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="how many times to time each step")
+    parser.add_argument("--output", default="sounds_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    sources = {key: path for key, path in ANIMAL_SOUNDS.items() if os.path.exists(path)}
+    if not sources:
+        print("No animal sounds found")
+        return 1
+
+    samples = {"decode_all": [], "decode_one": [], "pack_build": [], "pack_read": [], "bank_get": []}
+    pack_path = os.path.join(tempfile.mkdtemp(), "animals.pack")
+    bank = sound_bank.SoundBank()
+    for key, sound in sound_bank.build_sound_pack(pack_path, sources).items():
+        bank.add(key, sound)
+
+    for _ in range(args.repeat):
+        # What play_current_sound used to do on every play
+        _, seconds = timed(lambda: [pygame.mixer.Sound(path) for path in sources.values()])
+        samples["decode_all"].append(seconds)
+        for path in sources.values():
+            samples["decode_one"].append(timed(pygame.mixer.Sound, path)[1])
+        samples["pack_build"].append(timed(sound_bank.build_sound_pack, pack_path, sources)[1])
+        samples["pack_read"].append(timed(sound_bank.read_sound_pack, pack_path, sources)[1])
+        # What a play costs now, before the mixer takes over
+        for key in sources:
+            samples["bank_get"].append(timed(bank.get, key)[1])
+
+    metrics = {name: percentiles(values) for name, values in samples.items()}
+    print(f"{len(sources)} clips, pack size {os.path.getsize(pack_path) / 1024:.0f} KiB")
+    print_metrics(metrics)
+
+    write_results(args.output, "sounds", {
+        "config": {"clips": len(sources), "repeat": args.repeat, "mixer": list(pygame.mixer.get_init())},
+        "pack_bytes": os.path.getsize(pack_path),
+        "metrics": metrics,
+    })
+    os.remove(pack_path)
+
+    if args.baseline:
+        print(f"\nCompared with {args.baseline}:")
+        regressions = compare_to_baseline(metrics, args.baseline, args.tolerance)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
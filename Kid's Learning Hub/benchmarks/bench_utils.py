@@ -0,0 +1,76 @@
+"""Helpers shared by the benchmark scripts"""
+import os
+import sys
+import json
+import time
+import platform
+
+# Make the project modules (voice_utils, assets.games, ...) importable
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+def percentiles(values):
+    """Summarize a list of numbers as count, mean, p50, p90, p99 and max"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return {"count": 0}
+    def pick(fraction):
+        return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": values[-1],
+    }
+
+def timed(function, *args, **kwargs):
+    """Call function and return (result, seconds taken)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def write_results(path, name, results):
+    """Write benchmark results as JSON, with enough context to compare runs"""
+    report = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+    report.update(results)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {path}")
+    return report
+
+def compare_to_baseline(metrics, baseline_path, tolerance):
+    """
+    Print how each metric's p50/p90 moved against a previous results file.
+    Returns the list of metrics that got slower by more than 'tolerance'.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f).get("metrics", {})
+    regressions = []
+    for name, current in metrics.items():
+        previous = baseline.get(name)
+        if not previous or not current.get("count") or not previous.get("count"):
+            continue
+        for key in ("p50", "p90"):
+            old, new = previous[key], current[key]
+            change = (new - old) / old if old else 0.0
+            print(f"  {name:<24} {key}: {old:.4f} -> {new:.4f} ({change:+.1%})")
+            if change > tolerance:
+                regressions.append(f"{name} {key}")
+    return regressions
+
+def print_metrics(metrics):
+    for name, stats in metrics.items():
+        if not stats.get("count"):
+            print(f"  {name:<24} (no samples)")
+            continue
+        print(f"  {name:<24} p50={stats['p50']:.4f}  p90={stats['p90']:.4f}  "
+              f"p99={stats['p99']:.4f}  max={stats['max']:.4f}  (n={stats['count']})")
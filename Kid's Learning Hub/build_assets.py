@@ -0,0 +1,204 @@
+"""
+Offline build of the game pictures.
+
+The pictures in assets/images are large PNG/JPG files at whatever
+resolution they came in, but the games only ever show them at a few
+sizes. This builds, with Pillow, one pre-scaled variant of every picture
+for each display size and packs them into atlas sheets with an index:
+
+    assets/build/variants/<picture>@<width>x<height>.png
+    assets/build/atlas-<width>x<height>-<n>.png   (one display size per sheet)
+    assets/build/atlas.json
+
+The games take pictures from the atlas when it is present and up to date,
+and fall back to the originals otherwise. Builds are incremental: a
+variant is only rendered again when its picture's content hash changes.
+
+Usage:
+    python build_assets.py                # build what changed
+    python build_assets.py --scales 1,1.5,2   # also build variants for high-DPI screens
+    python build_assets.py --force        # rebuild everything
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_FOLDER = os.path.join(ROOT_DIR, "assets", "images")
+BUILD_FOLDER = os.path.join(ROOT_DIR, "assets", "build")
+INDEX_NAME = "atlas.json"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Bump when the index layout changes
+ATLAS_VERSION = 1
+
+# Boxes (logical pixels) the games show pictures in
+DISPLAY_SIZES = {
+    "object": (400, 300),   # NameObjectGame
+    "animal": (180, 180),   # AnimalSoundGame reveal
+    "count": (120, 120),    # CountNumbersGame items (smaller tiles are scaled from this)
+}
+
+SHEET_SIZE = 2048
+PADDING = 1
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def asset_key(path):
+    """Key of a picture in the index: its path relative to the project, with '/'"""
+    return os.path.relpath(os.path.abspath(path), ROOT_DIR).replace(os.sep, "/")
+
+def fit_size(width, height, box_width, box_height):
+    """Size of a width x height picture scaled to fit the box, keeping its aspect ratio"""
+    scale = min(box_width / width, box_height / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def read_index(build_folder=BUILD_FOLDER):
+    try:
+        with open(os.path.join(build_folder, INDEX_NAME)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == ATLAS_VERSION else None
+
+def render_variants(source_path, boxes, variants_folder):
+    """Scale one picture to every box with Pillow; returns the variant records"""
+    variants = []
+    with Image.open(source_path) as image:
+        image.load()
+        image = image.convert("RGBA")
+        name = os.path.basename(source_path)
+        for box_width, box_height in boxes:
+            size = fit_size(image.width, image.height, box_width, box_height)
+            file_name = f"{name}@{box_width}x{box_height}.png"
+            image.resize(size, Image.LANCZOS).save(os.path.join(variants_folder, file_name), optimize=True)
+            variants.append({"box": [box_width, box_height], "size": list(size), "file": file_name})
+    return variants
+
+def pack_sheets(entries, sheet_size=SHEET_SIZE, padding=PADDING):
+    """
+    Shelf-pack variant sizes into sheets. 'entries' is a list of
+    (width, height, payload); returns a list of sheets, each a list of
+    (x, y, payload).
+    """
+    sheets = []
+    for width, height, payload in sorted(entries, key=lambda e: (-e[1], -e[0])):
+        if width > sheet_size or height > sheet_size:
+            raise ValueError(f"{width}x{height} picture does not fit a {sheet_size}px sheet")
+        for sheet in sheets:
+            shelf = sheet["shelves"][-1]
+            if shelf["x"] + width <= sheet_size and height <= shelf["height"]:
+                break
+            if shelf["y"] + shelf["height"] + padding + height <= sheet_size:
+                sheet["shelves"].append({"y": shelf["y"] + shelf["height"] + padding, "x": 0, "height": height})
+                break
+        else:
+            sheet = {"shelves": [{"y": 0, "x": 0, "height": height}], "items": []}
+            sheets.append(sheet)
+        shelf = sheet["shelves"][-1]
+        sheet["items"].append((shelf["x"], shelf["y"], payload))
+        shelf["x"] += width + padding
+    return [sheet["items"] for sheet in sheets]
+
+def build_assets(images_folder=IMAGES_FOLDER, build_folder=BUILD_FOLDER, scales=(1,), force=False):
+    """Bring the variants, atlas sheets and index up to date; returns the index"""
+    variants_folder = os.path.join(build_folder, "variants")
+    os.makedirs(variants_folder, exist_ok=True)
+    old_index = None if force else read_index(build_folder)
+    old_images = old_index["images"] if old_index else {}
+    # Rounded the way the games round logical sizes to device pixels, so 1.25 or 1.5 match too
+    boxes = sorted(set((round(w * scale), round(h * scale)) for w, h in DISPLAY_SIZES.values() for scale in scales))
+
+    images = {}
+    changed = old_index is None or old_index.get("boxes") != [list(box) for box in boxes]
+    for name in sorted(os.listdir(images_folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        path = os.path.join(images_folder, name)
+        key = asset_key(path)
+        stat = os.stat(path)
+        content_hash = _hash_file(path)
+        old = old_images.get(key)
+        if (old and old["hash"] == content_hash
+                and [v["box"] for v in old["variants"]] == [list(box) for box in boxes]
+                and all(os.path.exists(os.path.join(variants_folder, v["file"])) for v in old["variants"])):
+            variants = [{k: v[k] for k in ("box", "size", "file")} for v in old["variants"]]
+        else:
+            print(f"Scaling {name}...")
+            variants = render_variants(path, boxes, variants_folder)
+            changed = True
+        images[key] = {"hash": content_hash, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                       "variants": variants}
+    changed = changed or set(images) != set(old_images)
+
+    sheet_names = old_index["sheets"] if old_index else []
+    if not changed and all(os.path.exists(os.path.join(build_folder, s)) for s in sheet_names):
+        # Same pictures: only refresh the recorded file stamps
+        print("Assets are up to date")
+        old_index["images"] = {key: dict(old_images[key], bytes=info["bytes"], mtime_ns=info["mtime_ns"])
+                               for key, info in images.items()}
+        _write_index(build_folder, old_index)
+        return old_index
+
+    # Pack each display size on its own sheets, so a game only loads the sizes it shows
+    sheet_names = []
+    for box in boxes:
+        entries = [(v["size"][0], v["size"][1], v) for info in images.values()
+                   for v in info["variants"] if v["box"] == list(box)]
+        for number, items in enumerate(pack_sheets(entries)):
+            sheet_name = f"atlas-{box[0]}x{box[1]}-{number}.png"
+            sheet = Image.new("RGBA", (SHEET_SIZE, SHEET_SIZE), (0, 0, 0, 0))
+            for x, y, variant in items:
+                with Image.open(os.path.join(variants_folder, variant["file"])) as picture:
+                    sheet.paste(picture, (x, y))
+                variant["sheet"] = len(sheet_names)
+                variant["rect"] = [x, y, variant["size"][0], variant["size"][1]]
+            # Crop the unused part of the sheet
+            used_width = max(x + variant["size"][0] for x, y, variant in items)
+            used_height = max(y + variant["size"][1] for x, y, variant in items)
+            sheet.crop((0, 0, used_width, used_height)).save(os.path.join(build_folder, sheet_name), optimize=True)
+            sheet_names.append(sheet_name)
+            print(f"Wrote {sheet_name} ({len(items)} pictures)")
+
+    # Remove sheets and variants left over from an earlier build
+    for name in os.listdir(build_folder):
+        if name.startswith("atlas-") and name.endswith(".png") and name not in sheet_names:
+            os.remove(os.path.join(build_folder, name))
+    variant_files = set(v["file"] for info in images.values() for v in info["variants"])
+    for name in os.listdir(variants_folder):
+        if name not in variant_files:
+            os.remove(os.path.join(variants_folder, name))
+
+    index = {"version": ATLAS_VERSION, "boxes": [list(box) for box in boxes],
+             "sheets": sheet_names, "images": images}
+    _write_index(build_folder, index)
+    return index
+
+def _write_index(build_folder, index):
+    # Write the index last and in one rename, so readers never see a half-built atlas
+    path = os.path.join(build_folder, INDEX_NAME)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build pre-scaled pictures and the texture atlas used by the games.")
+    parser.add_argument("--scales", default="1", help="comma-separated device pixel ratios to build for, e.g. 1,1.25,1.5,2 (default: 1)")
+    parser.add_argument("--force", action="store_true", help="rebuild every variant")
+    args = parser.parse_args(argv)
+
+    scales = tuple(float(scale) for scale in args.scales.split(","))
+    build_assets(scales=scales, force=args.force)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
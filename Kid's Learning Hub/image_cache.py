@@ -0,0 +1,171 @@
+"""
+Process-wide cache of scaled images.
+
+Decoding a full-size picture and smooth-scaling it is the slowest part of
+showing a new round, and the games keep coming back to the same pictures
+at the same sizes. Scaled pixmaps are kept per (file, size, device pixel
+ratio) in a memory-bounded LRU, so showing a picture again costs nothing.
+
+When the atlas made by build_assets.py is present, pictures are cut out
+of its pre-scaled sheets instead of decoding the full-size originals;
+pictures the atlas does not have (or that changed since it was built)
+still come from the originals. Decoded sheets are kept in the same LRU,
+so they count against the budget like any other pixmap.
+
+The budget is KLH_IMAGE_CACHE_MB megabytes (default 64). Pixmaps belong
+to the GUI thread, so the cache must only be used from there.
+"""
+import os
+import json
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPixmap
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ATLAS_FOLDER = os.path.join(ROOT_DIR, "assets", "build")
+ATLAS_INDEX = os.path.join(ATLAS_FOLDER, "atlas.json")
+ATLAS_VERSION = 1
+
+DEFAULT_MAX_BYTES = int(os.environ.get("KLH_IMAGE_CACHE_MB", "64")) * 1024 * 1024
+
+def _pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+class AssetAtlas:
+    """Pre-scaled pictures packed into sheets by build_assets.py"""
+    def __init__(self, index_path=ATLAS_INDEX):
+        self.folder = os.path.dirname(index_path)
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get("version") != ATLAS_VERSION:
+            raise ValueError(f"{index_path}: unsupported atlas version")
+        self.sheet_names = index["sheets"]
+        self.images = index["images"]
+        # picture key -> whether the original still matches the atlas
+        self._fresh = {}
+
+    def _is_fresh(self, key, info):
+        fresh = self._fresh.get(key)
+        if fresh is None:
+            try:
+                stat = os.stat(os.path.join(ROOT_DIR, key))
+                fresh = stat.st_size == info["bytes"] and stat.st_mtime_ns == info["mtime_ns"]
+            except OSError:
+                fresh = False
+            if not fresh:
+                print(f"Atlas is out of date for {key}; run 'python build_assets.py'")
+            self._fresh[key] = fresh
+        return fresh
+
+    def find(self, path, width, height):
+        """
+        Return (sheet path, rect, box) of the smallest pre-scaled variant
+        of 'path' made for a box of at least width x height device pixels,
+        or None
+        """
+        key = os.path.relpath(os.path.abspath(path), ROOT_DIR).replace(os.sep, "/")
+        info = self.images.get(key)
+        if info is None or not self._is_fresh(key, info):
+            return None
+        variants = [v for v in info["variants"] if v["box"][0] >= width and v["box"][1] >= height]
+        if not variants:
+            return None
+        variant = min(variants, key=lambda v: v["box"][0] * v["box"][1])
+        return (os.path.join(self.folder, self.sheet_names[variant["sheet"]]),
+                QRect(*variant["rect"]), tuple(variant["box"]))
+
+def load_atlas(index_path=ATLAS_INDEX):
+    """Return the asset atlas, or None if it has not been built"""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        return AssetAtlas(index_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring asset atlas: {e}")
+        return None
+
+class PixmapCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, atlas=None):
+        self.max_bytes = max_bytes
+        self.atlas = atlas
+        # (path, width, height, dpr, aspect mode) -> scaled QPixmap, and ("atlas sheet", path)
+        # -> decoded sheet, least recently used first
+        self._pixmaps = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, width, height, dpr=1.0, aspect_mode=Qt.KeepAspectRatio):
+        """
+        Return the image at 'path' smooth-scaled to fit width x height
+        logical pixels on a screen with the given device pixel ratio.
+        A missing or unreadable file gives a null pixmap.
+        """
+        key = (path, width, height, dpr, aspect_mode)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+            return pixmap
+        self.misses += 1
+
+        # Scale to device pixels so the picture stays sharp on high-DPI screens
+        device_width, device_height = round(width * dpr), round(height * dpr)
+        found = None
+        if self.atlas is not None and aspect_mode == Qt.KeepAspectRatio:
+            variant = self.atlas.find(path, device_width, device_height)
+            if variant is not None:
+                sheet = self._sheet(variant[0])
+                if not sheet.isNull():
+                    found = sheet.copy(variant[1]), variant[2]
+        if found is not None and found[1] == (device_width, device_height):
+            # Built for exactly this box: no scaling at all
+            pixmap = found[0]
+        else:
+            source = found[0] if found is not None else QPixmap(path)
+            if source.isNull():
+                return source
+            pixmap = source.scaled(device_width, device_height, aspect_mode, Qt.SmoothTransformation)
+        pixmap.setDevicePixelRatio(dpr)
+        self._store(key, pixmap)
+        return pixmap
+
+    def _sheet(self, sheet_path):
+        """The decoded atlas sheet at 'sheet_path', kept in the LRU with the pictures"""
+        key = ("atlas sheet", sheet_path)
+        sheet = self._pixmaps.get(key)
+        if sheet is not None:
+            self._pixmaps.move_to_end(key)
+            return sheet
+        sheet = QPixmap(sheet_path)
+        if not sheet.isNull():
+            self._store(key, sheet)
+        return sheet
+
+    def clear(self):
+        self._pixmaps.clear()
+        self._bytes = 0
+
+    def _store(self, key, pixmap):
+        size = _pixmap_bytes(pixmap)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._pixmaps[key] = pixmap
+        self._bytes += size
+        # Evict the least recently used pixmaps beyond the budget
+        while self.max_bytes is not None and self._bytes > self.max_bytes:
+            _, old_pixmap = self._pixmaps.popitem(last=False)
+            self._bytes -= _pixmap_bytes(old_pixmap)
+
+# Global cache shared by every game window
+_pixmap_cache = None
+
+def get_pixmap_cache():
+    global _pixmap_cache
+    if _pixmap_cache is None:
+        _pixmap_cache = PixmapCache(atlas=load_atlas())
+    return _pixmap_cache
+
+def get_scaled_pixmap(path, width, height, dpr=1.0):
+    """Scaled pixmap for 'path' from the shared cache (see PixmapCache.get)"""
+    return get_pixmap_cache().get(path, width, height, dpr)
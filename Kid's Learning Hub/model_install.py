@@ -0,0 +1,193 @@
+"""
+One-time installation of the Vosk voice model.
+
+Extracts vosk-model-en-in-0.5.zip into voice_model/ with a manifest of
+every file's size and SHA-256, then renames the finished directory into
+place, so the app only ever sees a complete model and never unzips
+anything at runtime.
+
+Usage:
+    python model_install.py            # install (or adopt a manually copied model)
+    python model_install.py --verify   # re-hash every file against the manifest
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import argparse
+
+MODEL_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voice_model")
+MODEL_NAME = "vosk-model-en-in-0.5"
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".install.lock"
+TEMP_PREFIX = ".install-"
+
+# A lock older than this was left behind by an installer that crashed
+STALE_LOCK_SECONDS = 3600
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_manifest(model_dir):
+    """Return the manifest (relative path -> size and SHA-256) for a model directory"""
+    files = {}
+    for folder, _, names in os.walk(model_dir):
+        for name in names:
+            path = os.path.join(folder, name)
+            relative = os.path.relpath(path, model_dir).replace(os.sep, "/")
+            if relative == MANIFEST_NAME:
+                continue
+            files[relative] = {"size": os.path.getsize(path), "sha256": _hash_file(path)}
+    return {"name": os.path.basename(model_dir), "files": files}
+
+def write_manifest(model_dir, manifest):
+    with open(os.path.join(model_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+def read_manifest(model_dir):
+    try:
+        with open(os.path.join(model_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_model_installed(model_dir):
+    """Fast check: the manifest exists and every file in it has the recorded size"""
+    manifest = read_manifest(model_dir)
+    if manifest is None:
+        return False
+    for relative, info in manifest["files"].items():
+        try:
+            if os.path.getsize(os.path.join(model_dir, relative)) != info["size"]:
+                return False
+        except OSError:
+            return False
+    return True
+
+def verify_model(model_dir):
+    """Slow check: re-hash every file and compare it with the manifest"""
+    manifest = read_manifest(model_dir)
+    if manifest is None:
+        return False
+    for relative, info in manifest["files"].items():
+        path = os.path.join(model_dir, relative)
+        if not os.path.isfile(path) or _hash_file(path) != info["sha256"]:
+            print(f"Model file damaged or missing: {relative}")
+            return False
+    return True
+
+def find_installed_model(model_root=MODEL_ROOT):
+    """
+    Return the directory of the installed model, or None.
+    A directory copied in by hand (no manifest) is still accepted, with a
+    reminder to run this installer so it gets one.
+    """
+    for name in (MODEL_NAME, "model"):
+        model_dir = os.path.join(model_root, name)
+        if not os.path.isdir(model_dir):
+            continue
+        if is_model_installed(model_dir):
+            return model_dir
+        if read_manifest(model_dir) is None:
+            print(f"Voice model at {model_dir} has no manifest; run 'python model_install.py' to check it.")
+            return model_dir
+        print(f"Voice model at {model_dir} does not match its manifest.")
+    return None
+
+def _acquire_lock(model_root):
+    lock_path = os.path.join(model_root, LOCK_NAME)
+    try:
+        if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+            os.remove(lock_path)
+    except OSError:
+        pass
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        raise RuntimeError(f"Another model installation is running (remove {lock_path} if it is not)")
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    return lock_path
+
+def _extract(zip_path, target_dir):
+    """Extract the archive, returning the model directory inside it"""
+    with zipfile.ZipFile(zip_path) as archive:
+        archive.extractall(target_dir)
+    entries = [name for name in os.listdir(target_dir) if not name.startswith(".")]
+    if len(entries) == 1 and os.path.isdir(os.path.join(target_dir, entries[0])):
+        return os.path.join(target_dir, entries[0])
+    return target_dir
+
+def install_model(zip_path=None, model_root=MODEL_ROOT, force=False):
+    """
+    Install the model from its zip file and return the installed directory.
+    Does nothing if a complete installation is already present.
+    """
+    final_dir = os.path.join(model_root, MODEL_NAME)
+    if not force and is_model_installed(final_dir):
+        print(f"Voice model already installed at {final_dir}")
+        return final_dir
+
+    os.makedirs(model_root, exist_ok=True)
+    lock_path = _acquire_lock(model_root)
+    try:
+        # Clear out whatever an interrupted installation left behind
+        for name in os.listdir(model_root):
+            if name.startswith(TEMP_PREFIX):
+                shutil.rmtree(os.path.join(model_root, name), ignore_errors=True)
+
+        if not force and os.path.isdir(final_dir) and read_manifest(final_dir) is None:
+            # Copied in by hand: adopt it instead of extracting again
+            print(f"Writing manifest for {final_dir}...")
+            write_manifest(final_dir, build_manifest(final_dir))
+            return final_dir
+
+        zip_path = zip_path or os.path.join(model_root, MODEL_NAME + ".zip")
+        if not os.path.exists(zip_path):
+            raise FileNotFoundError(f"Voice model not found at {zip_path}")
+
+        temp_dir = os.path.join(model_root, f"{TEMP_PREFIX}{os.getpid()}")
+        print(f"Extracting {zip_path}...")
+        model_dir = _extract(zip_path, temp_dir)
+        print("Hashing model files...")
+        write_manifest(model_dir, build_manifest(model_dir))
+
+        # Swap the finished directory into place in one rename
+        if os.path.isdir(final_dir):
+            old_dir = os.path.join(model_root, f"{TEMP_PREFIX}old-{os.getpid()}")
+            os.rename(final_dir, old_dir)
+            os.rename(model_dir, final_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.rename(model_dir, final_dir)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        print(f"Voice model installed at {final_dir}")
+        return final_dir
+    finally:
+        os.remove(lock_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Install the Vosk voice model used by the games.")
+    parser.add_argument("--zip", help="path to vosk-model-en-in-0.5.zip (default: voice_model/)")
+    parser.add_argument("--force", action="store_true", help="reinstall even if the model is already installed")
+    parser.add_argument("--verify", action="store_true", help="re-hash the installed model against its manifest")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        model_dir = find_installed_model()
+        ok = model_dir is not None and verify_model(model_dir)
+        print("Voice model OK" if ok else "Voice model is missing or damaged")
+        return 0 if ok else 1
+
+    install_model(args.zip, force=args.force)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Phonetic index of a game's vocabulary, for near-miss answers.
+
+Young children's answers often come back from the recognizer as
+near-misses: "zeebra", "kangaru", "xylo phone". Each vocabulary phrase is
+reduced once to a Metaphone key (how it sounds, spaces removed), and every
+key is stored along with its one-letter deletions. A lookup reduces the
+heard word the same way, so the only phrases it has to score are the ones
+whose key is at most about one edit away. A phrase's score (0-1) mixes how
+alike the keys are with how alike the spellings are.
+
+Metaphone drops vowels, so a key alone can't tell "cut" from "cat" or
+"block" from "black". A word whose first vowel differs from a phrase's is
+a different word, not a near-miss, and never matches it.
+"""
+
+VOWELS = frozenset("aeiou")
+
+def metaphone(word):
+    """Metaphone key of a word (a simplified version of Lawrence Philips' rules)"""
+    word = "".join(c for c in word.lower() if "a" <= c <= "z")
+    if not word:
+        return ""
+    # Silent or changed first letters: "knee", "wrist", "xylophone", "whale"
+    if word[:2] in ("ae", "gn", "kn", "pn", "wr"):
+        word = word[1:]
+    elif word[0] == "x":
+        word = "s" + word[1:]
+    elif word[:2] == "wh":
+        word = "w" + word[2:]
+
+    key = []
+    length = len(word)
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i else ""
+        next1 = word[i + 1] if i + 1 < length else ""
+        next2 = word[i + 2] if i + 2 < length else ""
+        if c == prev and c != "c":
+            continue
+        if c in VOWELS:
+            # Only a leading vowel is kept, and all vowels sound alike there
+            if i == 0:
+                key.append("A")
+        elif c == "b":
+            if not (prev == "m" and i == length - 1):
+                key.append("B")
+        elif c == "c":
+            if next1 == "i" and next2 == "a" or next1 == "h":
+                key.append("K" if prev == "s" else "X")
+            elif next1 in ("i", "e", "y"):
+                if prev != "s":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif c == "d":
+            key.append("J" if next1 == "g" and next2 in ("e", "i", "y") else "T")
+        elif c == "g":
+            if next1 == "h" and next2 and next2 not in VOWELS:
+                continue
+            if next1 == "n" and (i + 2 == length or word[i + 2:i + 4] == "ed"):
+                continue
+            if prev == "d" and next1 in ("e", "i", "y"):
+                continue
+            key.append("J" if next1 in ("i", "e", "y") else "K")
+        elif c == "h":
+            if next1 in VOWELS and prev not in ("c", "s", "p", "t", "g"):
+                key.append("H")
+        elif c == "k":
+            if prev != "c":
+                key.append("K")
+        elif c == "p":
+            key.append("F" if next1 == "h" else "P")
+        elif c == "q":
+            key.append("K")
+        elif c == "s":
+            if next1 == "h" or next1 == "i" and next2 in ("o", "a"):
+                key.append("X")
+            else:
+                key.append("S")
+        elif c == "t":
+            if next1 == "i" and next2 in ("o", "a"):
+                key.append("X")
+            elif next1 == "h":
+                key.append("0")
+            elif not (next1 == "c" and next2 == "h"):
+                key.append("T")
+        elif c == "v":
+            key.append("F")
+        elif c in ("w", "y"):
+            if next1 in VOWELS:
+                key.append(c.upper())
+        elif c == "x":
+            key.append("KS")
+        elif c == "z":
+            key.append("S")
+        else:
+            key.append(c.upper())
+    return "".join(key)
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def similarity(a, b):
+    """1 for equal strings, down to 0 for completely different ones"""
+    if not a and not b:
+        return 1.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+def first_vowel(spelling):
+    """The first vowel letter of a spelling, with 'y' after a consonant read as 'i'"""
+    for i, c in enumerate(spelling):
+        if c in VOWELS:
+            return c
+        if c == "y" and i:
+            return "i"
+    return ""
+
+def _deletions(key):
+    """The key and every way of deleting one letter from it"""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+class PhoneticIndex:
+    """Scores words against one vocabulary by sound and spelling"""
+    def __init__(self, phrases):
+        # spelling (letters only) -> phrase, key and first vowel, and deletion bucket -> spellings
+        self.spellings = {}
+        self._keys = {}
+        self._vowels = {}
+        self._buckets = {}
+        for phrase in phrases:
+            spelling = "".join(c for c in str(phrase).lower() if c.isalpha())
+            if not spelling:
+                continue
+            self.spellings[spelling] = phrase
+            key = self._keys[spelling] = metaphone(spelling)
+            self._vowels[spelling] = first_vowel(spelling)
+            for bucket in _deletions(key):
+                self._buckets.setdefault(bucket, set()).add(spelling)
+
+    def lookup(self, word):
+        """Return (phrase, score) of the closest phrase to 'word', or (None, 0)"""
+        spelling = "".join(c for c in word.lower() if c.isalpha())
+        if not spelling:
+            return None, 0.0
+        if spelling in self.spellings:
+            return self.spellings[spelling], 1.0
+        key = metaphone(spelling)
+        vowel = first_vowel(spelling)
+        candidates = set()
+        for bucket in _deletions(key):
+            candidates |= self._buckets.get(bucket, set())
+
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            # A word that only adds letters to a phrase is another word: "start", "category"
+            if spelling.startswith(candidate):
+                continue
+            # Another first vowel is another word: "cut", "block", "what"
+            if self._vowels[candidate] != vowel:
+                continue
+            # Sounding alike counts twice as much as being spelled alike
+            score = (2 * similarity(key, self._keys[candidate]) + similarity(spelling, candidate)) / 3
+            if score > best_score or score == best_score and best is not None and candidate < best:
+                best, best_score = candidate, score
+        return (self.spellings[best], best_score) if best is not None else (None, 0.0)
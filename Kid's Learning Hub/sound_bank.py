@@ -0,0 +1,245 @@
+"""
+Process-wide bank of decoded sounds.
+
+Each sound is read from disk and decoded to the mixer format once, kept
+resident with its preset volume and played by key, so answering a
+question never touches the disk on the GUI thread. Pinned sounds (the
+feedback chimes) always stay loaded; other sounds share an optional
+size-bounded LRU. Groups of clips (the animal sounds) can be cached on
+disk as a sound pack of raw PCM already in the mixer format.
+"""
+import os
+import json
+import struct
+import threading
+from collections import OrderedDict
+import pygame
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUNDS_FOLDER = os.path.join(ROOT_DIR, "assets", "sounds")
+CACHE_FOLDER = os.path.join(ROOT_DIR, "cache")
+
+# Bump when the pack file layout changes
+PACK_VERSION = 1
+
+# Feedback sounds shared by every game: key -> file in SOUNDS_FOLDER
+FEEDBACK_SOUNDS = {
+    "correct_answer": "correct_answer.wav",
+    "wrong_answer": "wrong_answer.wav",
+}
+
+# Budget for unpinned sounds (bytes of decoded audio); None means unbounded
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+def _sound_bytes(sound):
+    """Size of a decoded sound in the mixer's sample format"""
+    frequency, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+class SoundBank:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        # key -> (path, volume, pinned)
+        self._sources = {}
+        # key -> decoded pygame Sound, least recently used first
+        self._sounds = OrderedDict()
+        self._missing = set()
+        self._bytes = 0
+
+    def register(self, key, path, volume=1.0, pinned=False):
+        """Make a sound file playable under 'key' (decoded on preload or first play)"""
+        with self._lock:
+            self._sources[key] = (path, volume, pinned)
+            self._missing.discard(key)
+
+    def add(self, key, sound, volume=1.0, pinned=False):
+        """Add an already decoded Sound under 'key'"""
+        with self._lock:
+            sound.set_volume(volume)
+            self._sources[key] = (None, volume, pinned)
+            self._store(key, sound)
+
+    def get(self, key):
+        """Return the decoded Sound for 'key', or None if it has no file"""
+        with self._lock:
+            sound = self._sounds.get(key)
+            if sound is not None:
+                self._sounds.move_to_end(key)
+                return sound
+            if key in self._missing or key not in self._sources:
+                return None
+            path, volume, pinned = self._sources[key]
+            if path is None or not os.path.exists(path):
+                self._missing.add(key)
+                return None
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sound = pygame.mixer.Sound(path)
+            sound.set_volume(volume)
+            self._store(key, sound)
+            return sound
+
+    def get_loaded(self, key):
+        """Return the Sound for 'key' only if it is already decoded"""
+        with self._lock:
+            return self._sounds.get(key)
+
+    def play(self, key, volume=None):
+        """Play the sound for 'key'; 'volume' overrides the preset for this play only"""
+        sound = self.get(key)
+        if sound is None:
+            return None
+        channel = sound.play()
+        if channel is not None and volume is not None:
+            # The channel volume multiplies the sound's preset volume
+            channel.set_volume(volume / sound.get_volume() if sound.get_volume() else 0.0)
+        return channel
+
+    def preload(self, keys=None):
+        """Decode the given sounds (default: all registered) ahead of time"""
+        for key in list(keys if keys is not None else self._sources):
+            self.get(key)
+
+    def _store(self, key, sound):
+        old_sound = self._sounds.pop(key, None)
+        if old_sound is not None and not self._sources[key][2]:
+            self._bytes -= _sound_bytes(old_sound)
+        self._sounds[key] = sound
+        self._sounds.move_to_end(key)
+        if self._sources[key][2]:
+            return
+        self._bytes += _sound_bytes(sound)
+        # Evict the least recently used unpinned sounds beyond the budget
+        if self.max_bytes is not None:
+            for old_key in list(self._sounds):
+                if self._bytes <= self.max_bytes:
+                    break
+                if old_key == key or self._sources[old_key][2]:
+                    continue
+                self._bytes -= _sound_bytes(self._sounds.pop(old_key))
+
+# Global sound bank shared by every game window
+_sound_bank = None
+_sound_bank_lock = threading.Lock()
+
+def get_sound_bank():
+    global _sound_bank
+    with _sound_bank_lock:
+        if _sound_bank is None:
+            _sound_bank = SoundBank()
+            for key, filename in FEEDBACK_SOUNDS.items():
+                _sound_bank.register(key, os.path.join(SOUNDS_FOLDER, filename), pinned=True)
+    return _sound_bank
+
+def preload_sounds():
+    """Decode the shared sounds on a background thread"""
+    thread = threading.Thread(target=get_sound_bank().preload, daemon=True)
+    thread.start()
+    return thread
+
+def play_sound(key, volume=None):
+    return get_sound_bank().play(key, volume)
+
+# Sound packs: a group of clips decoded once to the mixer format and stored
+# as raw PCM in a single file, so later runs load them without decoding.
+# Layout: 4-byte header length, JSON header (mixer format, source file
+# stamps and key -> [offset, length]), then the PCM of every clip.
+
+_pack_lock = threading.Lock()
+
+def _source_stamps(sources):
+    stamps = {}
+    for key, path in sources.items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamps[key] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+def build_sound_pack(pack_path, sources):
+    """Decode every file in 'sources' (key -> path), write the pack and return key -> Sound"""
+    stamps = _source_stamps(sources)
+    sounds, index, chunks = {}, {}, []
+    offset = 0
+    for key in stamps:
+        sound = pygame.mixer.Sound(sources[key])
+        raw = sound.get_raw()
+        index[key] = [offset, len(raw)]
+        offset += len(raw)
+        chunks.append(raw)
+        sounds[key] = sound
+    header = json.dumps({
+        "version": PACK_VERSION,
+        "format": list(pygame.mixer.get_init()),
+        "sources": stamps,
+        "index": index,
+    }).encode()
+
+    # Write to a temporary file first so a half-written pack is never read
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+    temp_path = f"{pack_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for raw in chunks:
+            f.write(raw)
+    os.replace(temp_path, pack_path)
+    return sounds
+
+def read_sound_pack(pack_path, sources):
+    """Return key -> Sound from the pack, or None if it is missing or out of date"""
+    try:
+        with open(pack_path, "rb") as f:
+            (size,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(size))
+            data = memoryview(f.read())
+    except (OSError, ValueError, struct.error):
+        return None
+    if (header.get("version") != PACK_VERSION
+            or header.get("format") != list(pygame.mixer.get_init())
+            or header.get("sources") != _source_stamps(sources)):
+        return None
+    # Already in the mixer format: no decoding or resampling, just a copy
+    return {key: pygame.mixer.Sound(buffer=data[offset:offset + length])
+            for key, (offset, length) in header["index"].items()}
+
+def load_sound_pack(name, sources, volume=1.0):
+    """
+    Put the sounds in 'sources' (key -> path) into the shared bank from the
+    pack cache/<name>.pack, building or rebuilding it when the clips or the
+    mixer format changed. Returns the number of sounds loaded.
+    """
+    bank = get_sound_bank()
+    with _pack_lock:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pack_path = os.path.join(CACHE_FOLDER, f"{name}.pack")
+        sounds = read_sound_pack(pack_path, sources)
+        if sounds is None:
+            print(f"Building sound pack {pack_path}...")
+            try:
+                sounds = build_sound_pack(pack_path, sources)
+            except OSError as e:
+                # A read-only install still gets the sounds, just not the cache
+                print(f"Could not write sound pack: {e}")
+                sounds = {key: pygame.mixer.Sound(sources[key]) for key in _source_stamps(sources)}
+        for key, sound in sounds.items():
+            bank.add(key, sound, volume, pinned=True)
+    return len(sounds)
+
+def preload_sound_pack(name, sources, volume=1.0):
+    """
+    Register the sounds so they can be played right away (decoded on first
+    play) and load their pack on a background thread
+    """
+    bank = get_sound_bank()
+    missing = [key for key in sources if bank.get_loaded(key) is None]
+    if not missing:
+        return None
+    for key in missing:
+        bank.register(key, sources[key], volume, pinned=True)
+    thread = threading.Thread(target=load_sound_pack, args=(name, sources, volume), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,258 @@
+"""
+Offline text-to-speech with a cache of pre-rendered phrases.
+
+The games only ever say a small, known set of phrases ("What is this?",
+"Correct! It's a cat", ...). Each game registers its phrases with
+register_phrases(), preload_speech() renders the missing ones with the
+local pyttsx3 engine on its render thread into cache/speech/, and
+speaking a phrase (audio_scheduler.speak) then just plays the cached
+clip. A clip's file name is a hash of its text and the voice settings,
+so only new or changed phrases are ever rendered again. A phrase that
+was never registered is rendered on its first use and cached like the
+others.
+
+Render every game's phrases ahead of time (and drop stale clips) with:
+    python speech_cache.py
+Without pyttsx3 installed, or if its engine fails to start, phrases are
+only printed.
+"""
+import os
+import sys
+import hashlib
+import queue
+import argparse
+import importlib
+import itertools
+import threading
+from sound_bank import get_sound_bank, CACHE_FOLDER
+
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+SPEECH_FOLDER = os.path.join(CACHE_FOLDER, "speech")
+
+# Voice settings; changing them renders every phrase again
+SPEECH_RATE = int(os.environ.get("KLH_SPEECH_RATE", "150"))   # words per minute
+SPEECH_VOICE = os.environ.get("KLH_SPEECH_VOICE", "")         # engine voice id, empty for the default
+SPEECH_VOLUME = 0.8
+
+# Games whose phrases 'python speech_cache.py' renders
+GAME_MODULES = [
+    "assets.games.name_object_game",
+    "assets.games.color_game_shapes",
+    "assets.games.shape_game",
+    "assets.games.animal_sound_game",
+    "assets.games.count_numbers_game",
+]
+
+# Phrases registered by the games, in registration order
+_phrases = {}
+_phrases_lock = threading.Lock()
+
+def register_phrases(phrases):
+    """Add phrases the games will speak, so they can be rendered ahead of time"""
+    with _phrases_lock:
+        for phrase in phrases:
+            _phrases[phrase] = None
+
+def registered_phrases():
+    with _phrases_lock:
+        return list(_phrases)
+
+def clip_path(text):
+    """Where the rendered clip for 'text' is cached"""
+    digest = hashlib.sha1(f"{SPEECH_VOICE}|{SPEECH_RATE}|{text}".encode()).hexdigest()[:16]
+    return os.path.join(SPEECH_FOLDER, f"{digest}.wav")
+
+# Errors pyttsx3 and its drivers (SAPI5, NSSpeechSynthesizer, eSpeak) raise
+# when the engine cannot start or cannot synthesize a phrase
+ENGINE_ERRORS = (ImportError, RuntimeError, OSError)
+
+# Render priorities: a phrase waiting to be spoken goes before the preload
+PRIORITY_NOW = 0
+PRIORITY_PRELOAD = 1
+
+class RenderJob:
+    """Phrases waiting to be rendered, and how many of them were"""
+    def __init__(self, texts):
+        self.texts = texts
+        self.rendered = 0
+        self.done = threading.Event()
+
+class SpeechRenderer:
+    """
+    Renders phrases to WAV files with pyttsx3. The engine is created on,
+    and only ever used from, one render thread (SAPI5 needs COM set up on
+    the thread that uses it), with a priority queue of jobs in front of
+    it. Each phrase is its own job, so a phrase needed right now waits for
+    at most the one being rendered, not a game's whole preload.
+
+    With threaded=False jobs run on the calling thread instead, which the
+    command line uses (the macOS driver only works on the main thread).
+    """
+    def __init__(self, threaded=True):
+        self.threaded = threaded
+        self.installed = pyttsx3 is not None
+        # Why the engine could not start, once it has failed
+        self.error = None
+        self._engine = None
+        self._jobs = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def available(self):
+        """Whether phrases can be rendered: pyttsx3 is installed and its engine started"""
+        return self.installed and self.error is None
+
+    def render(self, texts, priority=PRIORITY_NOW, wait=True):
+        """
+        Render the phrases that have no clip yet. With 'wait', returns how
+        many were rendered once they are done; otherwise returns at once.
+        """
+        if not self.available:
+            return 0
+        jobs = [RenderJob([text]) for text in dict.fromkeys(texts) if not os.path.exists(clip_path(text))]
+        if not self.threaded:
+            for job in jobs:
+                self._run(job)
+            return sum(job.rendered for job in jobs)
+        self._start_thread()
+        for job in jobs:
+            self._jobs.put((priority, next(self._order), job))
+        if not wait:
+            return 0
+        for job in jobs:
+            job.done.wait()
+        return sum(job.rendered for job in jobs)
+
+    def _start_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._serve, daemon=True)
+                self._thread.start()
+
+    def _serve(self):
+        """Render thread: owns the engine and works through the queue"""
+        while True:
+            _, _, job = self._jobs.get()
+            self._run(job)
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = pyttsx3.init()
+            self._engine.setProperty("rate", SPEECH_RATE)
+            if SPEECH_VOICE:
+                self._engine.setProperty("voice", SPEECH_VOICE)
+        return self._engine
+
+    def _run(self, job):
+        try:
+            missing = [text for text in job.texts if not os.path.exists(clip_path(text))]
+            if not missing or not self.available:
+                return
+            try:
+                engine = self._get_engine()
+            except ENGINE_ERRORS as e:
+                self.error = str(e)
+                print(f"Text-to-speech engine could not start: {e}")
+                return
+            os.makedirs(SPEECH_FOLDER, exist_ok=True)
+            # Render into temporary files so a half-written clip is never played
+            temp_paths = {text: f"{clip_path(text)}.{os.getpid()}.tmp.wav" for text in missing}
+            try:
+                for text, temp_path in temp_paths.items():
+                    engine.save_to_file(text, temp_path)
+                engine.runAndWait()
+            except ENGINE_ERRORS as e:
+                # Only these phrases are lost; start from a fresh engine for the next ones
+                print(f"Could not render {missing}: {e}")
+                self._engine = None
+            for text, temp_path in temp_paths.items():
+                if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
+                    os.replace(temp_path, clip_path(text))
+                    job.rendered += 1
+                elif os.path.exists(temp_path):
+                    os.remove(temp_path)
+        finally:
+            job.done.set()
+
+# Global renderer shared by every game window
+_renderer = None
+_renderer_lock = threading.Lock()
+
+def get_renderer():
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = SpeechRenderer()
+    return _renderer
+
+def preload_speech():
+    """Queue the registered phrases that have no clip yet to be rendered in the background"""
+    get_renderer().render(registered_phrases(), PRIORITY_PRELOAD, wait=False)
+
+def can_render():
+    """Whether missing clips can be rendered (pyttsx3 is installed and working)"""
+    return get_renderer().available
+
+def cached_clip(text):
+    """Sound bank key of the clip for 'text' if it is already cached, else None"""
+    path = clip_path(text)
+    if not os.path.exists(path):
+        return None
+    key = f"speech/{os.path.basename(path)}"
+    bank = get_sound_bank()
+    if bank.get_loaded(key) is None:
+        bank.register(key, path, SPEECH_VOLUME)
+    return key
+
+def speech_clip(text):
+    """
+    Sound bank key of the cached clip for 'text', rendering it first if
+    needed (ahead of any preload, after the phrase being rendered); None
+    when there is no text-to-speech
+    """
+    if cached_clip(text) is None:
+        get_renderer().render([text])
+    return cached_clip(text)
+
+def prune_clips(keep):
+    """Delete cached clips that are not for any of the phrases in 'keep'"""
+    wanted = set(os.path.basename(clip_path(text)) for text in keep)
+    removed = 0
+    for name in os.listdir(SPEECH_FOLDER) if os.path.isdir(SPEECH_FOLDER) else []:
+        if name not in wanted:
+            os.remove(os.path.join(SPEECH_FOLDER, name))
+            removed += 1
+    return removed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render every phrase the games speak into cache/speech.")
+    parser.add_argument("--keep-stale", action="store_true", help="keep clips of phrases no game registers")
+    args = parser.parse_args(argv)
+
+    if pyttsx3 is None:
+        print("pyttsx3 is not installed (pip install pyttsx3)")
+        return 1
+    # Render on this (main) thread, which every pyttsx3 driver supports
+    global _renderer
+    _renderer = SpeechRenderer(threaded=False)
+    # Importing the games registers their phrases
+    for module in GAME_MODULES:
+        importlib.import_module(module)
+    phrases = registered_phrases()
+    rendered = get_renderer().render(phrases)
+    if get_renderer().error is not None:
+        print(f"Rendering failed: {get_renderer().error}")
+        return 1
+    print(f"Rendered {rendered} of {len(phrases)} phrases into {SPEECH_FOLDER}")
+    if not args.keep_stale:
+        print(f"Removed {prune_clips(phrases)} stale clips")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
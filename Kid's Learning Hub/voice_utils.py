@@ -1,10 +1,19 @@
 import os
 import json
-import wave
-import pyaudio
+import math
+import time
+import array
+import atexit
 import threading
 from vosk import Model, KaldiRecognizer
+from PyQt5.QtCore import QObject, pyqtSignal
 import pygame
+from asr_worker import AsrWorker
+from model_install import find_installed_model
+from audio_sources import create_audio_source
+from answer_matching import NEGATION_WORDS, SCOPE_BREAKERS, UNKNOWN_WORD, get_matcher, parse_numbers, number_may_grow
+# speak() queues pre-rendered phrases from the offline TTS cache on the audio scheduler
+from audio_scheduler import speak
 
 # Initialize pygame mixer for audio playback with lower volume
 pygame.mixer.init()
@@ -13,80 +22,602 @@ pygame.mixer.music.set_volume(0.3)  # Set default volume to 30%
 # Path to the voice model
 MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voice_model")
 
+# Where decoding runs: "thread" (in this process) or "process" (in a separate
+# worker process, see asr_worker.py)
+ASR_MODE = os.environ.get("KLH_ASR_MODE", "thread")
+
+# Find the directory of the Vosk model. The model is installed once with
+# model_install.py; nothing is extracted while the games are running.
+def get_vosk_model_path():
+    model_path = find_installed_model(MODEL_PATH)
+    if model_path is None:
+        raise FileNotFoundError("Voice model is not installed. Run 'python model_install.py' first.")
+    return model_path
+
 # Load the Vosk model
 def get_vosk_model():
-    # Check if the model is already extracted
-    if os.path.isdir(os.path.join(MODEL_PATH, "model")):
-        model_path = os.path.join(MODEL_PATH, "model")
-    elif os.path.isdir(os.path.join(MODEL_PATH, "vosk-model-en-in-0.5")):
-        model_path = os.path.join(MODEL_PATH, "vosk-model-en-in-0.5")
-    else:
-        # Model needs to be extracted
-        import zipfile
-        zip_path = os.path.join(MODEL_PATH, "vosk-model-en-in-0.5.zip")
-        if os.path.exists(zip_path):
-            print("Extracting voice model...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(MODEL_PATH)
-            model_path = os.path.join(MODEL_PATH, "vosk-model-en-in-0.5")
-        else:
-            raise FileNotFoundError(f"Voice model not found at {zip_path}")
-    
-    return Model(model_path)
+    return Model(get_vosk_model_path())
 
 # Global variable to store the model once loaded
 _vosk_model = None
+_model_lock = threading.Lock()
+_model_ready = threading.Event()
 
-def get_model():
+def get_model(progress=None):
+    """
+    Return the shared Vosk model, loading and warming it up on first use.
+    'progress' is an optional callback taking (percent, message).
+    """
     global _vosk_model
-    if _vosk_model is None:
-        _vosk_model = get_vosk_model()
+    with _model_lock:
+        if _vosk_model is None:
+            if progress:
+                progress(10, "Loading voice model...")
+            model = get_vosk_model()
+            if progress:
+                progress(70, "Warming up voice model...")
+            # Decode one second of silence so the model pages are touched
+            # now rather than during the first child's answer
+            recognizer = KaldiRecognizer(model, 16000)
+            recognizer.AcceptWaveform(b"\x00" * 32000)
+            recognizer.FinalResult()
+            _vosk_model = model
+            _model_ready.set()
     return _vosk_model
 
-def speak(text):
-    """
-    Text-to-speech function using pygame's ability to play audio files.
-    In a production app, you'd replace this with a proper TTS engine.
-    """
-    print(f"Speaking: {text}")
-    # For now, we'll just print. In production, connect this to a TTS engine.
-    # This is a placeholder, as we're focusing on speech recognition
-
-def listen(timeout=5):
-    """
-    Listen for speech and return the recognized text using Vosk
-    """
-    model = get_model()
-    recognizer = KaldiRecognizer(model, 16000)
-    
-    mic = pyaudio.PyAudio()
-    stream = mic.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True, frames_per_buffer=8192)
-    stream.start_stream()
-    
-    print("Listening...")
-    
-    # We'll listen for a maximum of 'timeout' seconds
-    frames = []
-    for i in range(0, int(16000 / 1024 * timeout)):
-        data = stream.read(1024)
-        frames.append(data)
-        if recognizer.AcceptWaveform(data):
-            result = json.loads(recognizer.Result())
-            text = result.get("text", "")
-            if text:
-                stream.stop_stream()
-                stream.close()
-                mic.terminate()
-                print(f"Recognized: {text}")
-                return text
-
-    # Process any remaining audio
-    final_result = json.loads(recognizer.FinalResult())
-    text = final_result.get("text", "")
-    
-    stream.stop_stream()
-    stream.close()
-    mic.terminate()
-    
-    print(f"Final recognized: {text}")
-    return text
+def is_model_ready():
+    return _model_ready.is_set()
+
+def model_error():
+    """Why the background model load failed, or None if it has not failed"""
+    return _model_error
+
+# Recognition worker process, used when ASR_MODE is "process"
+_asr_worker = None
+
+def get_asr_worker():
+    global _asr_worker
+    with _model_lock:
+        if _asr_worker is None:
+            _asr_worker = AsrWorker(get_vosk_model_path())
+            atexit.register(_asr_worker.close)
+    return _asr_worker
+
+def load_recognizer_backend(progress=None):
+    """Load the model in this process, or start the worker process that owns it"""
+    if ASR_MODE == "process":
+        if progress:
+            progress(10, "Starting voice worker...")
+        get_asr_worker().start()
+        _model_ready.set()
+    else:
+        get_model(progress)
+
+# Signals used to report the background model load to the UI
+class ModelSignals(QObject):
+    progress = pyqtSignal(int, str)
+    ready = pyqtSignal()
+    failed = pyqtSignal(str)
+
+model_signals = ModelSignals()
+_preload_thread = None
+_model_error = None
+_preload_lock = threading.Lock()
+
+def preload_model():
+    """
+    Start loading the voice model on a background thread.
+    Safe to call more than once; progress, readiness and failure are
+    reported through model_signals. A load that failed is not retried,
+    check model_error() for why.
+    """
+    global _preload_thread
+    with _preload_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=_preload_worker, daemon=True)
+            _preload_thread.start()
+    return model_signals
+
+def _preload_worker():
+    """Thread function for the background model load"""
+    global _model_error
+    try:
+        load_recognizer_backend(model_signals.progress.emit)
+    except Exception as e:
+        print(f"Voice model failed to load: {e}")
+        # Recorded before the signal, so a game opened later still sees it
+        _model_error = str(e)
+        model_signals.failed.emit(_model_error)
+        return
+
+    # Open the microphone and recognizer too, so the first turn is cheap
+    model_signals.progress.emit(90, "Opening microphone...")
+    try:
+        if ALWAYS_ARMED:
+            get_session().arm()
+        else:
+            get_session().prepare()
+    except Exception as e:
+        print(f"Microphone not ready yet: {e}")
+
+    model_signals.progress.emit(100, "Voice ready!")
+    model_signals.ready.emit()
+
+# Closed-vocabulary grammars registered by the games, by name
+_vocabularies = {}
+
+# Words kept in every grammar so negated answers, and the words that end
+# a negation ("no, actually a cat"), still come through
+GRAMMAR_COMMON_WORDS = (list(NEGATION_WORDS) + sorted(SCOPE_BREAKERS - {UNKNOWN_WORD})
+                        + ["a", "an", "this"])
+
+def build_grammar(words):
+    """Return the grammar for a vocabulary as a sorted tuple of phrases, usable as a cache key"""
+    phrases = set(str(word).lower().strip() for word in words)
+    phrases.update(GRAMMAR_COMMON_WORDS)
+    phrases.discard("")
+    return tuple(sorted(phrases))
+
+def register_vocabulary(name, words):
+    """
+    Register the closed vocabulary a game expects as an answer.
+    listen(vocabulary=name) then decodes against that grammar plus [unk]
+    instead of the full open vocabulary.
+    """
+    _vocabularies[name] = build_grammar(words)
+    return _vocabularies[name]
+
+# Audio capture settings shared by every game
+SAMPLE_RATE = 16000
+CHUNK_FRAMES = 1024
+
+# Always-armed capture: keep the microphone running between turns and
+# start each turn with the audio from just before the Answer button
+ALWAYS_ARMED = True
+PREROLL_SECONDS = 0.5
+RING_SECONDS = 4
+
+# Endpointing defaults (seconds / 16-bit RMS)
+LEADING_SILENCE = 3.0
+TRAILING_SILENCE = 0.7
+SPEECH_ENERGY_THRESHOLD = 400
+
+# Reasons a listening turn can end
+END_SPEECH = "speech_end"
+END_NO_SPEECH = "no_speech"
+END_MAX_DURATION = "max_duration"
+END_KEYWORD = "keyword"
+
+# Consecutive chunks a partial result must keep matching before a turn is accepted early
+KEYWORD_STABLE_CHUNKS = 2
+
+# N-best answers: how many alternatives the games ask the recognizer for,
+# and how likely (relative to the best one, 0-1) an alternative must be
+# for its answer to count
+ANSWER_ALTERNATIVES = int(os.environ.get("KLH_ANSWER_ALTERNATIVES", "3"))
+ALTERNATIVE_FLOOR = float(os.environ.get("KLH_ALTERNATIVE_FLOOR", "0.25"))
+
+def keyword_predicate(*targets):
+    """
+    Return an accept() function for listen_detailed() that is true when
+    the text says one of 'targets' as whole words and does not negate it
+    (the same rule the games use to check answers).
+    """
+    matcher = get_matcher(targets)
+    def accept(text):
+        return bool(matcher.answers(text))
+    return accept
+
+def number_predicate(number, largest=None):
+    """
+    Return an accept() function that is true when the text says 'number'
+    without negating it. It stays false while the last number heard could
+    still grow into another one up to 'largest' ("twenty" before "three"),
+    so the endpointer ends those turns instead.
+    """
+    def accept(text):
+        return number in parse_numbers(text) and not number_may_grow(text, largest)
+    return accept
+
+class Recognition(str):
+    """
+    Recognized text that also carries what else the recognizer heard:
+    'alternatives' is a list of dicts (best first) with the "text", its
+    "confidence" relative to the best alternative (1 for the best) and
+    its "words"; 'words' are the best alternative's words, dicts with
+    "word", "start" and "end" (seconds into the turn) and, when the
+    recognizer gives it, "conf" (0-1).
+    """
+    def __new__(cls, text, alternatives=None, words=None):
+        recognition = super().__new__(cls, text)
+        recognition.alternatives = alternatives or [{"text": text, "confidence": 1.0, "words": words or []}]
+        recognition.words = words or []
+        return recognition
+
+    def texts(self, floor=ALTERNATIVE_FLOOR):
+        """The texts of the alternatives at least 'floor' as likely as the best, best first"""
+        return [alternative["text"] for alternative in self.alternatives
+                if alternative["confidence"] >= floor and alternative["text"]]
+
+def answer_texts(answer, floor=ALTERNATIVE_FLOOR):
+    """Every text an answer could be: its likely alternatives, or just the text itself"""
+    if isinstance(answer, Recognition):
+        return answer.texts(floor) or [str(answer)]
+    return [answer]
+
+def parse_result(raw):
+    """
+    Turn a recognizer result (JSON, with or without alternatives and
+    words) into (text, alternatives, words) as described in Recognition.
+    """
+    result = json.loads(raw)
+    if "alternatives" in result:
+        alternatives = [{"text": a.get("text", ""), "confidence": a.get("confidence", 0.0),
+                         "words": a.get("result", [])} for a in result["alternatives"]]
+    else:
+        alternatives = [{"text": result.get("text", ""), "confidence": 0.0, "words": result.get("result", [])}]
+    # Vosk scores alternatives as log-likelihoods: make them relative to the best
+    best = max(a["confidence"] for a in alternatives) if alternatives else 0.0
+    for alternative in alternatives:
+        alternative["confidence"] = math.exp(min(0.0, alternative["confidence"] - best))
+    if not alternatives:
+        return "", [], []
+    return alternatives[0]["text"], alternatives, alternatives[0]["words"]
+
+def _rms(data):
+    """Root-mean-square level of a chunk of 16-bit mono audio"""
+    samples = array.array("h", data)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+class Endpointer:
+    """
+    Energy-based voice activity endpointer.
+    Ends the turn once the child stops talking, when nobody starts talking
+    within 'leading_silence' seconds, or after 'max_duration' seconds.
+    """
+    def __init__(self, rate=SAMPLE_RATE, leading_silence=LEADING_SILENCE, trailing_silence=TRAILING_SILENCE,
+                 max_duration=5.0, threshold=SPEECH_ENERGY_THRESHOLD, min_speech=0.1):
+        self.rate = rate
+        self.leading_silence = leading_silence
+        self.trailing_silence = trailing_silence
+        self.max_duration = max_duration
+        self.threshold = threshold
+        self.min_speech = min_speech
+        self.reset()
+
+    def reset(self):
+        self.elapsed = 0.0
+        self.speech_started = False
+        self.speech_time = 0.0
+        self.silence_time = 0.0
+        self.last_speech_at = None
+        self.noise_floor = 0.0
+        self.reason = None
+
+    def feed(self, data):
+        """Feed one chunk of audio; returns the end reason once the turn should stop, else None"""
+        duration = len(data) / 2.0 / self.rate
+        self.elapsed += duration
+        level = _rms(data)
+
+        # Speech has to stand out from the room noise as well as pass the fixed threshold
+        is_speech = level >= max(self.threshold, self.noise_floor * 3)
+
+        if is_speech:
+            self.speech_time += duration
+            self.silence_time = 0.0
+            self.last_speech_at = self.elapsed
+            if self.speech_time >= self.min_speech:
+                self.speech_started = True
+        else:
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * level
+            self.silence_time += duration
+            if not self.speech_started:
+                # A short click or bump is not the start of an answer
+                self.speech_time = 0.0
+
+        if self.speech_started and self.silence_time >= self.trailing_silence:
+            self.reason = END_SPEECH
+        elif not self.speech_started and self.elapsed >= self.leading_silence:
+            self.reason = END_NO_SPEECH
+        elif self.elapsed >= self.max_duration:
+            self.reason = END_MAX_DURATION
+        return self.reason
+
+class RingBuffer:
+    """
+    Fixed-size, preallocated byte ring written by the capture thread.
+    Positions are absolute byte offsets, so a reader can start anywhere in
+    the last 'capacity' bytes, which is how the pre-roll is replayed.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.written = 0
+        self._cond = threading.Condition()
+
+    def write(self, data):
+        total = len(data)
+        # Only the newest 'capacity' bytes of an oversized write can be kept
+        data = memoryview(data)[-self.capacity:]
+        size = len(data)
+        with self._cond:
+            start = (self.written + total - size) % self.capacity
+            first = min(size, self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            self._view[:size - first] = data[first:]
+            self.written += total
+            self._cond.notify_all()
+
+    def read(self, position, size, timeout=None):
+        """
+        Return (data, next_position) for 'size' bytes starting at 'position',
+        waiting for them to be written. Returns silence if nothing arrives in time.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.written >= position + size, timeout):
+                return bytes(size), position
+            # Skip ahead over anything that has already been overwritten
+            position = max(position, self.written - self.capacity)
+            start = position % self.capacity
+            first = min(size, self.capacity - start)
+            data = self._view[start:start + first].tobytes() + self._view[:size - first].tobytes()
+            return data, position + size
+
+class CaptureSession:
+    """
+    Long-lived speech capture session shared by all the games.
+    Owns one audio source (the microphone unless KLH_AUDIO_SOURCE says
+    otherwise, see audio_sources.py) and one recognizer per grammar, so a
+    listening turn only has to start the source and reset the recognizer.
+
+    Models built without a runtime graph ignore the grammar and decode
+    with the open vocabulary, exactly as before.
+
+    Once armed, a capture thread keeps reading a live source into a ring
+    buffer, and each turn starts PREROLL_SECONDS in the past so the first
+    syllable spoken while the button is pressed is not lost.
+    """
+    def __init__(self, rate=SAMPLE_RATE, chunk=CHUNK_FRAMES, source=None):
+        self.rate = rate
+        self.chunk = chunk
+        self.source = source or create_audio_source()
+        self._turn_lock = threading.Lock()
+        self._source_open = False
+        # Recognizers keyed by grammar tuple, None for the open vocabulary,
+        # and the (max alternatives, words) options last set on each
+        self._recognizers = {}
+        self._options = {}
+        # Always-armed capture state
+        self._ring = None
+        self._position = 0
+        self._capture_thread = None
+        self._capturing = False
+
+    def recognizer_for(self, grammar=None):
+        """Return the cached recognizer for a grammar, compiling it on first use"""
+        recognizer = self._recognizers.get(grammar)
+        if recognizer is None:
+            if ASR_MODE == "process":
+                recognizer = get_asr_worker().recognizer(grammar, self.rate)
+            elif grammar is None:
+                recognizer = KaldiRecognizer(get_model(), self.rate)
+            else:
+                recognizer = KaldiRecognizer(get_model(), self.rate, json.dumps(list(grammar) + ["[unk]"]))
+            self._recognizers[grammar] = recognizer
+        return recognizer
+
+    def open(self):
+        """Create the recognizers and open the audio source once"""
+        self.recognizer_for(None)
+        for grammar in list(_vocabularies.values()):
+            self.recognizer_for(grammar)
+        if not self._source_open:
+            self.source.open(self.rate, self.chunk)
+            self._source_open = True
+
+    def prepare(self):
+        """Open everything ahead of the first turn"""
+        with self._turn_lock:
+            self.open()
+
+    @property
+    def armed(self):
+        return self._capturing
+
+    def arm(self):
+        """Keep a live source running and buffer the most recent audio between turns"""
+        with self._turn_lock:
+            self.open()
+            if self._capturing or not self.source.live:
+                return
+            if self._ring is None:
+                self._ring = RingBuffer(int(RING_SECONDS * self.rate) * 2)
+            self._capturing = True
+            self.source.start()
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._capture_thread.start()
+
+    def _capture_loop(self):
+        """Thread function that copies live audio into the ring buffer"""
+        while self._capturing:
+            try:
+                data = self.source.read(self.chunk)
+            except Exception as e:
+                print(f"Microphone capture stopped: {e}")
+                self._capturing = False
+                break
+            self._ring.write(data)
+
+    def start_turn(self, grammar=None, alternatives=0, words=False):
+        """Begin a listening turn and return the (freshly reset) recognizer for the grammar"""
+        self._turn_lock.acquire()
+        try:
+            self.open()
+            recognizer = self.recognizer_for(grammar)
+            if self._options.get(grammar, (0, False)) != (alternatives, words):
+                recognizer.SetMaxAlternatives(alternatives)
+                recognizer.SetWords(words)
+                self._options[grammar] = (alternatives, words)
+            recognizer.Reset()
+            self.source.next_turn()
+            if self._capturing:
+                # Start from the pre-roll rather than from "now"
+                preroll = int(PREROLL_SECONDS * self.rate) * 2
+                self._position = max(0, self._ring.written - preroll)
+            else:
+                self.source.start()
+        except Exception:
+            self._turn_lock.release()
+            raise
+        return recognizer
+
+    def read(self):
+        """Read the next chunk of audio for the current turn"""
+        if self._capturing:
+            data, self._position = self._ring.read(self._position, self.chunk * 2, timeout=1.0)
+            return data
+        return self.source.read(self.chunk)
+
+    def end_turn(self):
+        """Finish the current turn, keeping the source and recognizer for the next one"""
+        try:
+            if not self._capturing:
+                self.source.stop()
+        finally:
+            self._turn_lock.release()
+
+    def close(self):
+        """Release the audio source"""
+        self._capturing = False
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=1.0)
+            self._capture_thread = None
+        with self._turn_lock:
+            if self._source_open:
+                self.source.stop()
+                self.source.close()
+                self._source_open = False
+            self._recognizers = {}
+            self._options = {}
+
+# Global capture session shared by every game window
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = CaptureSession()
+            atexit.register(_session.close)
+    return _session
+
+def set_audio_source(source):
+    """
+    Replace the audio source used by every game, e.g. with a
+    WavFileSource to drive rounds from recordings
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            atexit.unregister(_session.close)
+        _session = CaptureSession(source=source)
+        atexit.register(_session.close)
+    return _session
+
+def listen_detailed(timeout=5, vocabulary=None, leading_silence=LEADING_SILENCE, trailing_silence=TRAILING_SILENCE,
+                    on_partial=None, accept=None, alternatives=0, words=False):
+    """
+    Listen for one answer and return a dict with the recognized "text",
+    the "end_reason" (END_SPEECH, END_NO_SPEECH, END_MAX_DURATION or
+    END_KEYWORD) and the "duration" of audio captured, in seconds.
+    'timeout' is the maximum length of the turn.
+
+    For benchmarking, the dict also holds "first_partial_at" and
+    "speech_end_at" (seconds of audio into the turn, or None) and
+    "decode_time" (seconds spent inside the recognizer).
+
+    'on_partial' is called with each new partial hypothesis while the
+    child is speaking. If 'accept' is given (see keyword_predicate) and
+    returns True for KEYWORD_STABLE_CHUNKS chunks in a row, the turn ends
+    straight away with that partial as the text.
+
+    'alternatives' asks the recognizer for that many N-best alternatives
+    and 'words' for per-word timings and confidences; they are returned
+    as "alternatives" and "words" (see Recognition).
+    """
+    session = get_session()
+    endpointer = Endpointer(session.rate, leading_silence, trailing_silence, timeout)
+    recognizer = session.start_turn(_vocabularies.get(vocabulary), alternatives, words)
+    try:
+        print("Listening...")
+        
+        text = ""
+        hypotheses = []
+        word_list = []
+        partial = ""
+        stable_chunks = 0
+        first_partial_at = None
+        decode_time = 0.0
+        while True:
+            data = session.read()
+            reason = endpointer.feed(data)
+            decode_start = time.perf_counter()
+            finalized = recognizer.AcceptWaveform(data)
+            decode_time += time.perf_counter() - decode_start
+            if finalized:
+                # Kaldi finalized an utterance on its own
+                text, hypotheses, word_list = parse_result(recognizer.Result())
+                if text:
+                    reason = END_SPEECH
+                    break
+            elif on_partial or accept:
+                decode_start = time.perf_counter()
+                new_partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                decode_time += time.perf_counter() - decode_start
+                if new_partial != partial:
+                    partial = new_partial
+                    if partial and first_partial_at is None:
+                        first_partial_at = endpointer.elapsed
+                    if on_partial and partial:
+                        on_partial(partial)
+                if accept and partial and accept(partial):
+                    stable_chunks += 1
+                    if stable_chunks >= KEYWORD_STABLE_CHUNKS:
+                        text, hypotheses, word_list = partial, [], []
+                        reason = END_KEYWORD
+                        break
+                else:
+                    stable_chunks = 0
+            if reason:
+                # Process any remaining audio
+                decode_start = time.perf_counter()
+                final_result = recognizer.FinalResult()
+                decode_time += time.perf_counter() - decode_start
+                text, hypotheses, word_list = parse_result(final_result)
+                break
+        
+        print(f"Recognized: {text} ({reason} after {endpointer.elapsed:.2f}s)")
+        return {"text": text, "end_reason": reason, "duration": endpointer.elapsed,
+                "first_partial_at": first_partial_at, "speech_end_at": endpointer.last_speech_at,
+                "decode_time": decode_time,
+                "alternatives": hypotheses or [{"text": text, "confidence": 1.0, "words": word_list}],
+                "words": word_list}
+    finally:
+        session.end_turn()
+
+def listen(timeout=5, vocabulary=None, on_partial=None, accept=None, alternatives=0, words=False):
+    """
+    Listen for speech and return the recognized text using Vosk.
+    'vocabulary' names a grammar registered with register_vocabulary().
+    The text is a Recognition, so it also carries the alternatives and
+    words asked for with 'alternatives' and 'words'.
+    """
+    result = listen_detailed(timeout, vocabulary, on_partial=on_partial, accept=accept,
+                             alternatives=alternatives, words=words)
+    return Recognition(result["text"], result["alternatives"], result["words"])